@@ -0,0 +1,493 @@
+"""Headless benchmarks for notification.py.
+
+Runs under the offscreen Qt platform on a plain Linux box and writes the
+results as JSON so that runs can be compared:
+
+    python bench_notification.py --output bench.json
+    python bench_notification.py --quick
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5 import QtCore
+from PyQt5.QtWidgets import QApplication, QWidget
+
+import notification
+from notification import NotificationManager, NotificationType, Notifier, icon_cache
+
+TYPES = [NotificationType.SUCCESS, NotificationType.INFO, NotificationType.ERROR, NotificationType.WARNING]
+
+def percentiles(samples):
+    """Summarize a list of durations in seconds as milliseconds."""
+    ordered = sorted(samples)
+    def pick(fraction):
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+    return {
+        'count': len(ordered),
+        'mean_ms': statistics.fmean(ordered) * 1000,
+        'p50_ms': pick(0.50),
+        'p90_ms': pick(0.90),
+        'p99_ms': pick(0.99),
+        'max_ms': ordered[-1] * 1000,
+    }
+
+def rss_bytes():
+    """Resident set size of this process, or None where /proc is not available."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+def process_events(app, seconds=0.0):
+    """Run the event loop until it is idle, and for at least the given time."""
+    deadline = time.perf_counter() + seconds
+    app.processEvents()
+    while time.perf_counter() < deadline:
+        app.processEvents(QtCore.QEventLoop.AllEvents, 5)
+    # deleteLater() is not honoured outside a running event loop, so flush it explicitly
+    app.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+
+def make_window(app, width=800, height=600):
+    window = QWidget()
+    window.resize(width, height)
+    window.show()
+    process_events(app)
+    return window
+
+def make_manager(window, **kwargs):
+    # Unique messages would never coalesce; disabling dedup keeps the numbers comparable
+    kwargs.setdefault('dedup_window', None)
+    return NotificationManager(window, **kwargs)
+
+def dispose_manager(app, manager):
+    manager._layout_timer.stop()
+    for notifier in manager.active_notifications:
+        notifier.hide()
+        notifier.dispose()
+    manager.active_notifications.clear()
+    manager.notification_queue.clear()
+    manager.pool.clear()
+    if manager.parent is not None:
+        manager.parent.removeEventFilter(manager)
+    if manager.notification_icon is not None:
+        manager.notification_icon.deleteLater()
+    manager.deleteLater()
+    process_events(app)
+
+def bench_icons(app, iterations):
+    """Cost of create_colored_icon with a cold and a warm cache."""
+    cold = []
+    for i in range(iterations):
+        icon_cache.clear()
+        start = time.perf_counter()
+        notification.create_colored_icon(notification.NOTIFICATION_ICONS[TYPES[i % 4]], '#8ED2F9', 20)
+        cold.append(time.perf_counter() - start)
+    warm = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        notification.create_colored_icon(notification.NOTIFICATION_ICONS[TYPES[i % 4]], '#8ED2F9', 20)
+        warm.append(time.perf_counter() - start)
+    return {'cold': percentiles(cold), 'warm': percentiles(warm), 'cache': icon_cache.stats()}
+
+def bench_notifier_init(app, window, iterations):
+    """Cost and memory of constructing a Notifier directly."""
+    samples = []
+    notifiers = []
+    gc.collect()
+    rss_before = rss_bytes()
+    tracemalloc.start()
+    for i in range(iterations):
+        start = time.perf_counter()
+        notifiers.append(Notifier(window, f"Benchmark notification {i}", TYPES[i % 4]))
+        samples.append(time.perf_counter() - start)
+    python_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    rss_after = rss_bytes()
+    for notifier in notifiers:
+        notifier.deleteLater()
+    process_events(app)
+    result = {
+        'construct': percentiles(samples),
+        'python_bytes_per_notifier': python_bytes / iterations,
+    }
+    if rss_before is not None and rss_after is not None:
+        result['rss_bytes_per_notifier'] = (rss_after - rss_before) / iterations
+    return result
+
+def bench_submission_throughput(app, window, count):
+    """Notifications per second through add_notification and through the threaded inbox."""
+    manager = make_manager(window)
+    start = time.perf_counter()
+    for i in range(count):
+        manager.add_notification(f"Direct {i}", TYPES[i % 4])
+    direct = time.perf_counter() - start
+    dispose_manager(app, manager)
+
+    manager = make_manager(window)
+    start = time.perf_counter()
+    for i in range(count):
+        manager.submit(f"Submitted {i}", TYPES[i % 4])
+    enqueued = time.perf_counter() - start
+    while manager._inbox:
+        app.processEvents()
+    drained = time.perf_counter() - start
+    result = {
+        'count': count,
+        'add_notification_per_sec': count / direct,
+        'submit_enqueue_per_sec': count / enqueued,
+        'submit_end_to_end_per_sec': count / drained,
+        'batches': manager.batches_drained,
+    }
+    dispose_manager(app, manager)
+    return result
+
+def bench_render_modes(app, window, count):
+    """Show-and-close cycles per second through each display backend."""
+    result = {}
+    for render_mode in ('widgets', 'overlay', 'headless'):
+        manager = make_manager(window, render_mode=render_mode, auto_hide=False)
+        start = time.perf_counter()
+        for i in range(count):
+            manager.add_notification(f"{render_mode} {i}", TYPES[i % 4])
+            manager.active_notifications[-1].close_notification()
+        elapsed = time.perf_counter() - start
+        result[render_mode] = {'cycles_per_sec': count / elapsed}
+        dispose_manager(app, manager)
+    return result
+
+def bench_latency(app, window, iterations):
+    """Submit-to-visible latency through add_notification and through submit()."""
+    manager = make_manager(window, max_notifications=1, auto_hide=False)
+    direct = []
+    queued = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        manager.add_notification(f"Latency {i}", TYPES[i % 4])
+        notifier = manager.active_notifications[0]
+        if notifier.isHidden():
+            raise RuntimeError("notification was not shown synchronously")
+        direct.append(time.perf_counter() - start)
+        notifier.close_notification()
+
+        start = time.perf_counter()
+        manager.submit(f"Queued latency {i}", TYPES[i % 4])
+        while not manager.active_notifications:
+            app.processEvents()
+        queued.append(time.perf_counter() - start)
+        manager.active_notifications[0].close_notification()
+    dispose_manager(app, manager)
+    return {'add_notification': percentiles(direct), 'submit': percentiles(queued)}
+
+def bench_resize_storm(app, window, events, max_notifications):
+    """Cost of a burst of parent resize events with a full notification stack."""
+    manager = make_manager(window, max_notifications=max_notifications, auto_hide=False)
+    for i in range(max_notifications * 2):
+        manager.add_notification(f"Resize storm {i}", TYPES[i % 4])
+    process_events(app, 0.05)
+
+    passes = [0]
+    position = manager._position_notifications
+    def counted_position():
+        passes[0] += 1
+        position()
+    manager._position_notifications = counted_position
+    manager._layout_timer.timeout.disconnect()
+    manager._layout_timer.timeout.connect(counted_position)
+
+    start = time.perf_counter()
+    for i in range(events):
+        window.resize(800 + i % 200, 600)
+        app.processEvents()
+    dispatched = time.perf_counter() - start
+    process_events(app, 0.05)
+    settled = time.perf_counter() - start
+
+    forced = []
+    for i in range(min(events, 200)):
+        window.resize(800 + i % 200, 600)
+        start = time.perf_counter()
+        position()
+        forced.append(time.perf_counter() - start)
+    result = {
+        'events': events,
+        'notifications': max_notifications,
+        'dispatch_seconds': dispatched,
+        'settled_seconds': settled - 0.05,
+        'layout_passes': passes[0],
+        'forced_relayout': percentiles(forced),
+    }
+    window.resize(800, 600)
+    dispose_manager(app, manager)
+    return result
+
+def bench_progress_updates(app, window, updates, seconds):
+    """Cost of a keyed progress stream and how many updates actually reach the screen."""
+    manager = make_manager(window, auto_hide=False)
+    manager.update_notification('bench', "Progress 0", progress=0.0)
+    process_events(app)
+    interval = seconds / updates
+    start = time.perf_counter()
+    for i in range(updates):
+        manager.update_notification('bench', f"Progress {i}/{updates}", progress=i / updates)
+        # Spread the stream over the requested time so the throttle sees a steady rate
+        while time.perf_counter() < start + (i + 1) * interval:
+            app.processEvents()
+    elapsed = time.perf_counter() - start
+    process_events(app, 0.05)
+    result = {
+        'updates': updates,
+        'seconds': elapsed,
+        'updates_per_sec': updates / elapsed,
+        'updates_applied': manager.updates_applied,
+        'applied_per_sec': manager.updates_applied / elapsed,
+    }
+    dispose_manager(app, manager)
+    return result
+
+def bench_many_windows(app, windows, notifications):
+    """Per-window managers sharing one pool: widget reuse, and layout work caused by one window's resize."""
+    tops = [make_window(app, 800, 600) for _ in range(windows)]
+    pool = notification.shared_notifier_pool()
+    created_before = pool.created
+    for round_ in range(notifications):
+        for index, top in enumerate(tops):
+            NotificationManager.get_instance(top).add_notification(f"Window {index} #{round_}", TYPES[round_ % 4])
+        # Close one notification per window so widgets flow back into the shared pool
+        for top in tops:
+            NotificationManager.get_instance(top).active_notifications[-1].close_notification()
+    process_events(app)
+
+    passes = []
+    for top in tops:
+        manager = NotificationManager.get_instance(top)
+        counter = [0]
+        def counted(position=manager._position_notifications, counter=counter):
+            counter[0] += 1
+            position()
+        manager._layout_timer.timeout.disconnect()
+        manager._layout_timer.timeout.connect(counted)
+        passes.append(counter)
+    tops[0].resize(900, 600)
+    process_events(app, 0.05)
+    result = {
+        'windows': windows,
+        'notifications_per_window': notifications,
+        'widgets_created': pool.created - created_before,
+        'pool': pool.stats(),
+        'layout_passes_resized_window': passes[0][0],
+        'layout_passes_other_windows': sum(counter[0] for counter in passes[1:]),
+    }
+    for top in tops:
+        top.close()
+        top.deleteLater()
+    process_events(app)
+    return result
+
+DAEMON_CLIENT = """
+import sys, time
+from notification_client import NotificationClient
+start = time.perf_counter()
+with NotificationClient(sys.argv[1], batch_size=256) as client:
+    for i in range(int(sys.argv[2])):
+        client.notify(f"Daemon {i}", 'INFO')
+print(time.perf_counter() - start, client.accepted, client.dropped)
+"""
+
+def bench_daemon(app, window, count):
+    """Throughput from a separate Qt-free client process through the local-socket daemon."""
+    manager = make_manager(window, auto_hide=False)
+    name = f"bench-notifications-{os.getpid()}"
+    daemon = manager.serve(name, rate=1000000, burst=100000)
+    start = time.perf_counter()
+    client = subprocess.Popen(
+        [sys.executable, '-c', DAEMON_CLIENT, name, str(count)],
+        cwd=os.path.dirname(os.path.abspath(__file__)), stdout=subprocess.PIPE, text=True)
+    while client.poll() is None:
+        app.processEvents(QtCore.QEventLoop.AllEvents, 5)
+    elapsed = time.perf_counter() - start
+    client_seconds, accepted, dropped = client.stdout.read().split()
+    result = {
+        'count': count,
+        'client_seconds': float(client_seconds),
+        'end_to_end_seconds': elapsed,
+        'per_sec': count / float(client_seconds),
+        'accepted': int(accepted),
+        'dropped': int(dropped),
+    }
+    daemon.close()
+    dispose_manager(app, manager)
+    return result
+
+def bench_degradation(app, window, count, stall):
+    """Show cost at each degradation level, and how fast an adaptive manager degrades and recovers."""
+    per_level = {}
+    for level, name in enumerate(notification.DEGRADATION_LEVELS):
+        manager = make_manager(window, auto_hide=False)
+        manager.set_degradation_level(level)
+        start = time.perf_counter()
+        for i in range(count):
+            manager.add_notification(f"Level {level} {i}", TYPES[i % 4])
+            manager.active_notifications[-1].close_notification()
+        per_level[name] = {'cycles_per_sec': count / (time.perf_counter() - start)}
+        dispose_manager(app, manager)
+
+    manager = make_manager(window, adaptive=True, recovery_time=0.5)
+    levels = []
+    manager.degradation_changed.connect(lambda level: levels.append((time.perf_counter(), level)))
+    process_events(app, 0.3)
+    # Stall the event loop as an overloaded GUI thread would
+    start = time.perf_counter()
+    while manager.degradation_level < len(notification.DEGRADATION_LEVELS) - 1 and time.perf_counter() - start < 10:
+        app.processEvents()
+        time.sleep(stall)
+    degraded = time.perf_counter() - start
+    start = time.perf_counter()
+    while manager.degradation_level and time.perf_counter() - start < 30:
+        process_events(app, 0.05)
+    recovered = time.perf_counter() - start
+    result = {
+        'cycles_by_level': per_level,
+        'stall_seconds': stall,
+        'seconds_to_badge': degraded,
+        'seconds_to_recover': recovered,
+        'level_changes': len(levels),
+        'final_level': manager.degradation_level,
+    }
+    manager.set_adaptive(False)
+    dispose_manager(app, manager)
+    return result
+
+def bench_queue_drain(app, window, backlogs):
+    """Time to fill a pending backlog and to drain it by closing notifications one by one."""
+    results = {}
+    for backlog in backlogs:
+        manager = make_manager(window, auto_hide=False)
+        start = time.perf_counter()
+        for i in range(backlog + manager.max_notifications):
+            manager.add_notification(f"Backlog {i}", TYPES[i % 4])
+        filled = time.perf_counter() - start
+
+        start = time.perf_counter()
+        while manager.notification_queue:
+            manager.active_notifications[-1].close_notification()
+        drained = time.perf_counter() - start
+        process_events(app)
+        results[str(backlog)] = {
+            'fill_seconds': filled,
+            'drain_seconds': drained,
+            'drain_per_notification_us': drained / backlog * 1e6,
+        }
+        dispose_manager(app, manager)
+    return results
+
+def bench_backlog_memory(app, window, backlog, spill_threshold):
+    """Memory held by a large pending backlog, with and without spilling it to disk."""
+    results = {}
+    for threshold in (None, spill_threshold):
+        manager = make_manager(window, auto_hide=False, spill_threshold=threshold)
+        gc.collect()
+        rss_before = rss_bytes()
+        start = time.perf_counter()
+        for i in range(backlog + manager.max_notifications):
+            # A bounded set of distinct messages, as in a long outage repeating the same errors
+            manager.add_notification(f"Backlog {i % 1000}", TYPES[i % 4])
+            if i == manager.max_notifications:
+                # A keyed progress toast queued early, so later spills would page it out
+                manager.update_notification('backlog-job', "Backlog job 0%", progress=0.0)
+        filled = time.perf_counter() - start
+        rss_after = rss_bytes()
+        # Updating it again must find the queued record rather than queue a second one
+        queued = len(manager.notification_queue)
+        manager.update_notification('backlog-job', "Backlog job 50%", progress=0.5)
+        keyed_requeued = len(manager.notification_queue) - queued
+        queue_stats = manager.notification_queue.stats()
+        # Closing the "more" summary clears the whole backlog
+        start = time.perf_counter()
+        manager.active_notifications[0].close_notification()
+        cleared = time.perf_counter() - start
+        result = {
+            'backlog': backlog,
+            'fill_seconds': filled,
+            'clear_seconds': cleared,
+            'keyed_update_requeued': keyed_requeued,
+            'queue': queue_stats,
+        }
+        if rss_before is not None and rss_after is not None:
+            result['rss_growth_bytes'] = rss_after - rss_before
+        results['spill' if threshold else 'in_memory'] = result
+        dispose_manager(app, manager)
+    return results
+
+def run(quick=False, backlogs=None):
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    window = make_window(app)
+    scale = 0.1 if quick else 1.0
+    if backlogs is None:
+        backlogs = [10, 1000] if quick else [10, 1000, 100000]
+
+    def n(value):
+        return max(10, int(value * scale))
+
+    results = {}
+    stages = [
+        ('icons', lambda: bench_icons(app, n(200))),
+        ('notifier_init', lambda: bench_notifier_init(app, window, n(200))),
+        ('submission_throughput', lambda: bench_submission_throughput(app, window, n(20000))),
+        ('render_modes', lambda: bench_render_modes(app, window, n(5000))),
+        ('latency', lambda: bench_latency(app, window, n(500))),
+        ('resize_storm', lambda: bench_resize_storm(app, window, n(500), 10)),
+        ('progress_updates', lambda: bench_progress_updates(app, window, n(20000), 1.0)),
+        ('many_windows', lambda: bench_many_windows(app, 30, n(200))),
+        ('daemon', lambda: bench_daemon(app, window, n(50000))),
+        ('degradation', lambda: bench_degradation(app, window, n(2000), 0.8)),
+        ('queue_drain', lambda: bench_queue_drain(app, window, backlogs)),
+        ('backlog_memory', lambda: bench_backlog_memory(app, window, n(500000), n(20000))),
+    ]
+    for name, stage in stages:
+        start = time.perf_counter()
+        results[name] = stage()
+        print(f"{name}: {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+    window.close()
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'qt': QtCore.QT_VERSION_STR,
+            'pyqt': QtCore.PYQT_VERSION_STR,
+            'platform': platform.platform(),
+            'qpa': os.environ.get('QT_QPA_PLATFORM'),
+            'quick': quick,
+        },
+        'results': results,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', '-o', help="Write the JSON results to this file instead of stdout")
+    parser.add_argument('--quick', action='store_true', help="Run a smaller version of every benchmark")
+    parser.add_argument('--backlogs', type=lambda text: [int(v) for v in text.split(',')],
+                        help="Comma-separated pending backlog sizes for the queue drain benchmark")
+    args = parser.parse_args(argv)
+
+    report = run(quick=args.quick, backlogs=args.backlogs)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(text + '\n')
+    else:
+        print(text)
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,19 @@
 import sys
 import os
+import json
 import random
-from PyQt5 import QtCore, QtGui, QtWidgets
+import sqlite3
+import threading
+import time
+import heapq
+import itertools
+import mmap
+import pickle
+import struct
+import tempfile
+import weakref
+from collections import OrderedDict, deque
+from PyQt5 import QtCore, QtGui, QtWidgets, sip
 from PyQt5.QtWidgets import (
     QApplication, QPushButton, QLabel, QVBoxLayout, QWidget,
     QHBoxLayout
@@ -10,12 +22,14 @@ from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import (
     QIcon, QPixmap, QPainter, QColor, QFontMetrics
 )
-from PyQt5.QtSvg import QSvgRenderer
 
 # Define minimum window size for showing notifications
 MIN_WIDTH = 400
 MIN_HEIGHT = 300
 
+# Default seconds an auto-hiding notification stays on screen
+AUTO_HIDE_DURATION = 5.0
+
 # Define notification types
 class NotificationType:
     SUCCESS = 'SUCCESS'
@@ -24,27 +38,1273 @@ class NotificationType:
     WARNING = 'WARNING'
     MORE = 'MORE'  # New notification type for "more notifications"
 
+# Define colors for each notification type (text color only)
+NOTIFICATION_COLORS = {
+    NotificationType.SUCCESS: '#C5E384',  # Metallic Green
+    NotificationType.INFO: '#8ED2F9',     # Metallic Blue
+    NotificationType.ERROR: '#FF474C',    # Metallic Red
+    NotificationType.WARNING: '#FDD017',  # Metallic Yellow/Gold
+    NotificationType.MORE: '#D1D8DD'      # Metallic Silver
+}
+
+NOTIFICATION_ICONS = {
+    NotificationType.SUCCESS: 'success.svg',
+    NotificationType.INFO: 'info.svg',
+    NotificationType.ERROR: 'error.svg',
+    NotificationType.WARNING: 'warn.svg',
+    NotificationType.MORE: 'notification.svg'
+}
+
+# Queued notifications are shown most severe first
+NOTIFICATION_SEVERITY = {
+    NotificationType.ERROR: 4,
+    NotificationType.WARNING: 3,
+    NotificationType.INFO: 2,
+    NotificationType.SUCCESS: 1,
+    NotificationType.MORE: 0,
+}
+
+class PendingNotification:
+    """A notification waiting in the NotificationQueue."""
+    __slots__ = ('message', 'notification_type', 'auto_hide', 'priority', 'key', 'repeat_count', 'queued', 'created',
+                 'duration', 'progress')
+
+    def __init__(self, message, notification_type=NotificationType.INFO, auto_hide=True, priority=0, key=None,
+                 duration=None):
+        self.created = time.time()
+        self.message = message
+        # Type names are interned so queued records share one string per type
+        self.notification_type = sys.intern(notification_type) if type(notification_type) is str else notification_type
+        self.auto_hide = auto_hide
+        self.duration = duration  # Auto-hide seconds, or None for the manager default
+        self.progress = None  # Fraction shown as a progress bar, for keyed updatable notifications
+        self.priority = priority
+        self.key = key  # Coalescing key used to fold repeats into this notification
+        self.repeat_count = 1
+        self.queued = False
+
+def _pack_pending(entry):
+    """Flatten a NotificationQueue heap entry into a picklable tuple for a spill run."""
+    neg_severity, neg_priority, seq, record = entry
+    return (neg_severity, neg_priority, seq, record.message, record.notification_type, record.auto_hide,
+            record.key, record.repeat_count, record.created, record.duration, record.progress)
+
+def _unpack_pending(packed):
+    """Rebuild the heap entry of a record read back from a spill run."""
+    (neg_severity, neg_priority, seq, message, notification_type, auto_hide, key, repeat_count, created, duration,
+     progress) = packed
+    record = PendingNotification(message, notification_type, auto_hide, -neg_priority, key, duration)
+    record.repeat_count = repeat_count
+    record.created = created
+    record.progress = progress
+    return (neg_severity, neg_priority, seq, record)
+
+class _SpillRun:
+    """Pending records in display order, spilled to a memory-mapped temporary file.
+
+    Records are pickled in chunks, so repeated messages and types are stored
+    once per chunk, and they are paged back in one chunk at a time. The file
+    is closed once mapped, so a run holds a single descriptor.
+    """
+    CHUNK_SIZE = 256
+    _LENGTH = struct.Struct('<I')
+
+    def __init__(self, packed, directory=None):
+        """Write packed records (see _pack_pending), given in display order."""
+        self.count = 0
+        with tempfile.TemporaryFile(prefix='notifications-', suffix='.spill', dir=directory) as file:
+            chunk = []
+            for item in packed:
+                chunk.append(item)
+                if len(chunk) == self.CHUNK_SIZE:
+                    self._write_chunk(file, chunk)
+                    chunk = []
+            if chunk:
+                self._write_chunk(file, chunk)
+            file.flush()
+            self.size_bytes = file.tell()
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._offset = 0
+        self._buffer = deque()  # Packed records of the current chunk not yet taken
+
+    def _write_chunk(self, file, chunk):
+        data = pickle.dumps(chunk, pickle.HIGHEST_PROTOCOL)
+        file.write(self._LENGTH.pack(len(data)))
+        file.write(data)
+        self.count += len(chunk)
+
+    def _read_chunk(self, offset):
+        (length,) = self._LENGTH.unpack_from(self._map, offset)
+        start = offset + self._LENGTH.size
+        return pickle.loads(self._map[start:start + length]), start + length
+
+    def take(self):
+        """Return the heap entry of the next record in the run, or None once it is exhausted."""
+        if not self._buffer:
+            if self._offset >= self.size_bytes:
+                return None
+            chunk, self._offset = self._read_chunk(self._offset)
+            self._buffer.extend(chunk)
+        self.count -= 1
+        return _unpack_pending(self._buffer.popleft())
+
+    def packed(self):
+        """Iterate over the packed records not yet taken, without consuming them."""
+        yield from list(self._buffer)
+        offset = self._offset
+        while offset < self.size_bytes:
+            chunk, offset = self._read_chunk(offset)
+            yield from chunk
+
+    def entries(self):
+        """Iterate over the heap entries not yet taken, without consuming them."""
+        return (_unpack_pending(packed) for packed in self.packed())
+
+    def close(self):
+        self._map.close()
+
+def _coalesces_indefinitely(record):
+    """True for keyed and grouped records, which later updates and repeats must always find."""
+    return record.key is not None and record.key[0] != 'message'
+
+class NotificationQueue:
+    """Pending notifications ordered by severity, then caller priority, then arrival.
+
+    Backed by a binary heap, so push and pop are O(log n) and len() is O(1).
+    Items are PendingNotification records. Records removed out of order (for
+    example by a drop policy) are only flagged and skipped later, so remove()
+    is O(1) and the oldest/lowest-severity lookups are amortized O(1).
+
+    With a spill_threshold, once more than that many records are held in memory
+    the half that would be shown last is written to a sorted _SpillRun on disk.
+    The head of each run stays in the heap, so pop() merges the runs back in
+    order; len() still counts every record. A new run absorbs the newer runs
+    that are no larger than it, like a binary counter, so a backlog of n
+    records keeps O(log n) runs, and never more than MAX_SPILL_RUNS, open.
+    Spilled records are not offered to drop policies, and on_spill is called
+    with them so callers can drop their own references. Records for which
+    pinned(record) is true are never spilled.
+    """
+    MAX_SPILL_RUNS = 16
+
+    def __init__(self, spill_threshold=None, spill_dir=None, on_spill=None, pinned=None):
+        self._heap = []
+        self._counter = itertools.count()
+        self._size = 0  # Every queued record, in memory or spilled
+        self._memory_size = 0  # Queued records held in memory, including run heads
+        self._arrivals = deque()  # Records in arrival order, may hold removed records
+        self._levels = {}  # severity -> deque of records in arrival order, may hold removed records
+        self._level_sizes = {}  # severity -> number of records still queued in memory
+        self._messages = {}  # message -> [shared message string, number of queued records using it]
+        self.spill_threshold = spill_threshold
+        self.spill_dir = spill_dir
+        self.on_spill = on_spill
+        self.pinned = pinned
+        self._runs = []  # Oldest first; sizes roughly halve towards the newest
+        self._run_heads = {}  # record -> _SpillRun it was paged in from
+        self.spilled_count = 0  # Records written to disk so far
+
+    def push(self, record):
+        """Queue a record; a higher priority is shown sooner within its severity."""
+        severity = NOTIFICATION_SEVERITY.get(record.notification_type, 0)
+        record.queued = True
+        self._intern(record)
+        heapq.heappush(self._heap, (-severity, -record.priority, next(self._counter), record))
+        self._arrivals.append(record)
+        self._levels.setdefault(severity, deque()).append(record)
+        self._level_sizes[severity] = self._level_sizes.get(severity, 0) + 1
+        self._size += 1
+        self._memory_size += 1
+        if self.spill_threshold is not None and self._memory_size > self.spill_threshold:
+            self._spill()
+
+    def pop(self):
+        """Remove and return the next record to show."""
+        self._skip_removed()
+        record = heapq.heappop(self._heap)[3]
+        self._forget(record)
+        self._maybe_compact()
+        return record
+
+    def set_message(self, record, message):
+        """Replace the message of a queued record, keeping the shared message table exact."""
+        if record.queued:
+            self._release(record)
+            record.message = message
+            self._intern(record)
+        else:
+            record.message = message
+
+    def peek(self):
+        """Return the next notification to show without removing it."""
+        self._skip_removed()
+        return self._heap[0][3]
+
+    def remove(self, record):
+        """Remove a queued record without disturbing the order of the others."""
+        if not record.queued:
+            return
+        self._forget(record)
+        self._maybe_compact()
+
+    def oldest(self):
+        """Return the record that has been queued the longest, or None."""
+        arrivals = self._arrivals
+        while arrivals and not arrivals[0].queued:
+            arrivals.popleft()
+        return arrivals[0] if arrivals else None
+
+    def lowest_severity(self):
+        """Return the most recently queued record of the lowest queued severity, or None."""
+        for severity in sorted(self._level_sizes):
+            if self._level_sizes[severity]:
+                level = self._levels[severity]
+                while not level[-1].queued:
+                    level.pop()
+                return level[-1]
+        return None
+
+    def _forget(self, record):
+        record.queued = False
+        self._size -= 1
+        self._memory_size -= 1
+        self._release(record)
+        run = self._run_heads.pop(record, None)
+        if run is None:
+            self._level_sizes[NOTIFICATION_SEVERITY.get(record.notification_type, 0)] -= 1
+        else:
+            self._load_head(run)
+
+    def _intern(self, record):
+        # Identical queued messages share one string object
+        entry = self._messages.get(record.message)
+        if entry is None:
+            self._messages[record.message] = [record.message, 1]
+            return
+        entry[1] += 1
+        if record.message is not entry[0]:
+            record.message = entry[0]
+            key = record.key
+            if key is not None and key[0] == 'message':
+                record.key = ('message', entry[0], key[2])
+
+    def _release(self, record):
+        entry = self._messages.get(record.message)
+        if entry is not None:
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del self._messages[record.message]
+
+    def _spill(self):
+        """Write the half of the in-memory records that would be shown last to a new run."""
+        entries = sorted(entry for entry in self._heap if entry[3].queued)
+        keep = self.spill_threshold // 2
+        # Run heads stay in memory so their runs keep merging in order, and so do pinned records
+        pinned = self.pinned
+        kept = entries[:keep]
+        spilled = []
+        for entry in entries[keep:]:
+            if entry[3] in self._run_heads or (pinned is not None and pinned(entry[3])):
+                kept.append(entry)
+            else:
+                spilled.append(entry)
+        if not spilled:
+            return
+        token = instrumentation.begin('queue.spill')
+        # Merge newer runs no larger than the new one (and any beyond MAX_SPILL_RUNS) into it
+        merged = []
+        total = len(spilled)
+        while self._runs and (self._runs[-1].count <= total or len(self._runs) >= self.MAX_SPILL_RUNS):
+            old = self._runs.pop()
+            merged.append(old)
+            total += old.count
+        streams = [[_pack_pending(entry) for entry in spilled]] + [old.packed() for old in merged]
+        # Sequence numbers are unique, so packed records never compare beyond them
+        run = _SpillRun(heapq.merge(*streams), self.spill_dir)
+        if merged:
+            self._retire_runs(merged)
+        records = []
+        for entry in spilled:
+            record = entry[3]
+            record.queued = False
+            self._release(record)
+            self._level_sizes[NOTIFICATION_SEVERITY.get(record.notification_type, 0)] -= 1
+            records.append(record)
+        self._memory_size -= len(spilled)
+        self.spilled_count += len(spilled)
+        self._heap = kept
+        heapq.heapify(self._heap)
+        self._runs.append(run)
+        self._load_head(run)
+        self._compact()
+        instrumentation.count('queue.spilled', len(spilled))
+        instrumentation.end(token)
+        if self.on_spill is not None:
+            self.on_spill(records)
+
+    def _retire_runs(self, runs):
+        """Close runs whose remaining records were merged into another; their heads stay as plain records."""
+        retired = set(runs)
+        for record, run in list(self._run_heads.items()):
+            if run in retired:
+                del self._run_heads[record]
+                severity = NOTIFICATION_SEVERITY.get(record.notification_type, 0)
+                self._level_sizes[severity] = self._level_sizes.get(severity, 0) + 1
+                # Paged in from disk, so older than the records queued since; not the newest of its level
+                self._levels.setdefault(severity, deque()).appendleft(record)
+        for run in runs:
+            run.close()
+
+    def _load_head(self, run):
+        """Page the next record of a run into the heap, or retire the run once it is empty."""
+        entry = run.take()
+        if entry is None:
+            self._runs.remove(run)
+            run.close()
+            return
+        record = entry[3]
+        record.queued = True
+        self._intern(record)
+        self._run_heads[record] = run
+        self._memory_size += 1
+        heapq.heappush(self._heap, entry)
+
+    def _skip_removed(self):
+        heap = self._heap
+        while heap and not heap[0][3].queued:
+            heapq.heappop(heap)
+
+    def _maybe_compact(self):
+        # Rebuild once removed records dominate so memory stays proportional to the records held
+        limit = 2 * self._memory_size + 64
+        if len(self._heap) > limit or len(self._arrivals) > limit:
+            self._compact()
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if entry[3].queued]
+        heapq.heapify(self._heap)
+        self._arrivals = deque(record for record in self._arrivals if record.queued)
+        for severity, level in self._levels.items():
+            self._levels[severity] = deque(record for record in level if record.queued)
+
+    def clear(self):
+        for entry in self._heap:
+            entry[3].queued = False
+        self._heap.clear()
+        self._arrivals.clear()
+        self._levels.clear()
+        self._level_sizes.clear()
+        self._messages.clear()
+        for run in self._runs:
+            run.close()
+        self._runs.clear()
+        self._run_heads.clear()
+        self._size = 0
+        self._memory_size = 0
+
+    def stats(self):
+        return {
+            'queued': self._size,
+            'in_memory': self._memory_size,
+            'on_disk': self._size - self._memory_size,
+            'spill_runs': len(self._runs),
+            'spill_bytes': sum(run.size_bytes for run in self._runs),
+            'spilled_total': self.spilled_count,
+            'distinct_messages': len(self._messages),
+        }
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        """Iterate over the pending notifications in display order (O(n log n)).
+
+        Spilled records are read back from disk as fresh copies.
+        """
+        in_memory = sorted(entry for entry in self._heap if entry[3].queued)
+        streams = [in_memory] + [run.entries() for run in self._runs]
+        return (entry[3] for entry in heapq.merge(*streams))
+
+class TokenBucket:
+    """Token-bucket rate limiter: allows bursts of up to burst, refilled at rate per second."""
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, rate)
+        self._tokens = self.burst
+        self._last = time.monotonic()
+
+    def consume(self, tokens=1):
+        """Take tokens from the bucket; return False if there are not enough."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        if self._tokens < tokens:
+            return False
+        self._tokens -= tokens
+        return True
+
+# Drop policies decide what to discard when the pending backlog is full. Each one
+# is called with the queue and the incoming record and returns the record to drop,
+# which may be the incoming record itself.
+def drop_oldest(queue, incoming):
+    """Discard the record that has been waiting the longest."""
+    return queue.oldest() or incoming
+
+def drop_newest(queue, incoming):
+    """Discard the incoming record and keep the backlog as it is."""
+    return incoming
+
+def drop_lowest_severity(queue, incoming):
+    """Discard the least severe record, preferring to keep what is already queued on ties."""
+    candidate = queue.lowest_severity()
+    if candidate is None:
+        return incoming
+    incoming_severity = NOTIFICATION_SEVERITY.get(incoming.notification_type, 0)
+    if incoming_severity <= NOTIFICATION_SEVERITY.get(candidate.notification_type, 0):
+        return incoming
+    return candidate
+
+DROP_POLICIES = {
+    'drop-oldest': drop_oldest,
+    'drop-newest': drop_newest,
+    'drop-lowest-severity': drop_lowest_severity,
+}
+
+class ActiveNotifications:
+    """Insertion-ordered set of visible notifications with O(1) membership and removal."""
+    def __init__(self):
+        self._items = {}
+
+    def append(self, notification):
+        self._items[notification] = None
+
+    def remove(self, notification):
+        del self._items[notification]
+
+    def discard(self, notification):
+        self._items.pop(notification, None)
+
+    def clear(self):
+        self._items.clear()
+
+    def __contains__(self, notification):
+        return notification in self._items
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if index == 0:
+            return next(iter(self._items))
+        if index == -1:
+            return next(reversed(self._items))
+        return list(self._items)[index]
+
+class ExpiryScheduler(QtCore.QObject):
+    """Auto-hide deadlines for any number of notifications, driven by a single QTimer.
+
+    Deadlines are kept in a binary heap and only the earliest one is armed on
+    the timer, so schedule, extend, pause, resume and cancel are O(log n).
+    Superseded heap entries are skipped lazily, as in NotificationQueue.
+    Targets whose deadline passes have close_notification() called on them.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._heap = []  # (deadline, seq, target); may hold superseded entries
+        self._counter = itertools.count()
+        self._deadlines = {}  # target -> (deadline, seq) of its live heap entry
+        self._paused = {}  # target -> seconds that were left when it was paused
+        self._armed = None  # Deadline the timer is currently set for
+        self.expired_count = 0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._expire)
+
+    def schedule(self, target, duration):
+        """Close target after duration seconds, replacing any countdown it already has."""
+        self._paused.pop(target, None)
+        self._push(target, time.monotonic() + duration)
+
+    def extend(self, target, duration):
+        """Make target's countdown last at least duration seconds from now, if it has one."""
+        if target in self._paused:
+            self._paused[target] = max(self._paused[target], duration)
+            return
+        current = self._deadlines.get(target)
+        if current is None:
+            return
+        deadline = time.monotonic() + duration
+        if deadline > current[0]:
+            self._push(target, deadline)
+
+    def pause(self, target):
+        """Stop target's countdown, keeping the time it has left."""
+        current = self._deadlines.pop(target, None)
+        if current is None:
+            return
+        self._paused[target] = max(0.0, current[0] - time.monotonic())
+        self._maybe_compact()
+
+    def resume(self, target):
+        """Restart a paused countdown with the time it had left."""
+        remaining = self._paused.pop(target, None)
+        if remaining is not None:
+            self._push(target, time.monotonic() + remaining)
+
+    def cancel(self, target):
+        """Forget target's countdown, running or paused."""
+        self._paused.pop(target, None)
+        if self._deadlines.pop(target, None) is not None:
+            self._maybe_compact()
+
+    def cancel_all(self, targets=None):
+        """Forget the countdowns of targets, or of every target when targets is None."""
+        if targets is None:
+            self._heap.clear()
+            self._deadlines.clear()
+            self._paused.clear()
+            self._timer.stop()
+            self._armed = None
+            return
+        for target in targets:
+            self.cancel(target)
+
+    def remaining(self, target):
+        """Seconds left on target's countdown, or None if it has none."""
+        if target in self._paused:
+            return self._paused[target]
+        current = self._deadlines.get(target)
+        if current is None:
+            return None
+        return max(0.0, current[0] - time.monotonic())
+
+    def is_paused(self, target):
+        return target in self._paused
+
+    def stats(self):
+        return {
+            'scheduled': len(self._deadlines),
+            'paused': len(self._paused),
+            'expired': self.expired_count,
+        }
+
+    def __len__(self):
+        return len(self._deadlines) + len(self._paused)
+
+    def __contains__(self, target):
+        return target in self._deadlines or target in self._paused
+
+    def _push(self, target, deadline):
+        seq = next(self._counter)
+        self._deadlines[target] = (deadline, seq)
+        heapq.heappush(self._heap, (deadline, seq, target))
+        self._maybe_compact()
+        self._arm()
+
+    def _skip_superseded(self):
+        heap = self._heap
+        deadlines = self._deadlines
+        while heap:
+            current = deadlines.get(heap[0][2])
+            if current is not None and current[1] == heap[0][1]:
+                return
+            heapq.heappop(heap)
+
+    def _maybe_compact(self):
+        # Rebuild once superseded entries dominate so memory stays proportional to len()
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._heap = [(deadline, seq, target) for target, (deadline, seq) in self._deadlines.items()]
+            heapq.heapify(self._heap)
+
+    def _arm(self):
+        """Point the timer at the earliest live deadline."""
+        self._skip_superseded()
+        if not self._heap:
+            self._timer.stop()
+            self._armed = None
+            return
+        deadline = self._heap[0][0]
+        if deadline != self._armed or not self._timer.isActive():
+            self._armed = deadline
+            # Round up so the timer never fires before the deadline
+            self._timer.start(max(0, int((deadline - time.monotonic()) * 1000) + 1))
+
+    def _expire(self):
+        """Close every target whose deadline has passed, then re-arm for the next one."""
+        self._armed = None
+        token = instrumentation.begin('expiry.dispatch')
+        heap = self._heap
+        # Targets are closed one at a time: a close can cancel or reschedule the others
+        while True:
+            self._skip_superseded()
+            if not heap or heap[0][0] > time.monotonic():
+                break
+            target = heapq.heappop(heap)[2]
+            del self._deadlines[target]
+            self.expired_count += 1
+            target.close_notification()
+        self._arm()
+        instrumentation.end(token)
+
+_expiry_scheduler = None
+
+def expiry_scheduler():
+    """Return the process-wide ExpiryScheduler used by notifications shown without a manager."""
+    global _expiry_scheduler
+    if _expiry_scheduler is None:
+        _expiry_scheduler = ExpiryScheduler()
+    return _expiry_scheduler
+
+# Ways an adaptive NotificationManager sheds GUI-thread work, mildest first. Each
+# level also applies the ones before it.
+DEGRADATION_LEVELS = ('normal', 'coarse-batching', 'no-icons', 'reduced-stack', 'badge')
+DEGRADE_COARSE_BATCHING = 1  # Keyed updates and layout passes run COARSE_BATCH_FACTOR times less often
+DEGRADE_NO_ICONS = 2  # Type icons are neither rendered nor shown
+DEGRADE_REDUCED_STACK = 3  # At most degraded_max_notifications are shown at once
+DEGRADE_BADGE = 4  # Only the count badge is shown, as in a window that is too small
+
+# Event-loop lag, in seconds, at which an adaptive manager steps up to levels 1, 2, 3 and 4
+LAG_THRESHOLDS = (0.05, 0.1, 0.2, 0.4)
+COARSE_BATCH_FACTOR = 4
+
+class LagMonitor(QtCore.QObject):
+    """Measures how late the event loop runs, with a heartbeat timer.
+
+    Each beat compares the time since the previous beat with the timer
+    interval; the excess is time the thread spent busy elsewhere. lag is a
+    moving average of that excess that rises quickly and decays slowly, and
+    is emitted through measured after every beat. The heartbeat only runs
+    while a token handed out by acquire() has not been released.
+    """
+    measured = QtCore.pyqtSignal(float)
+
+    def __init__(self, interval=0.1, parent=None):
+        super().__init__(parent)
+        self.interval = interval
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.beats = 0
+        self._users = set()  # Tokens handed out by acquire() and not yet released
+        self._tokens = itertools.count()
+        self._last = None
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.setInterval(int(interval * 1000))
+        self._timer.timeout.connect(self._beat)
+
+    def acquire(self, owner=None):
+        """Start the heartbeat for one more user and return its token for release().
+
+        A QObject owner releases its token automatically when it is destroyed,
+        or when Python collects it.
+        """
+        token = next(self._tokens)
+        self._users.add(token)
+        if len(self._users) == 1:
+            self._last = time.monotonic()
+            self._timer.start()
+        if owner is not None:
+            # Neither may reference owner, or they would keep it alive
+            owner.destroyed.connect(lambda _=None, token=token: self.release(token))
+            weakref.finalize(owner, self.release, token)
+        return token
+
+    def release(self, token):
+        """Give up a token; the heartbeat stops once the last one is released. Idempotent."""
+        if token not in self._users:
+            return
+        self._users.discard(token)
+        if not self._users:
+            self._timer.stop()
+            self.lag = 0.0
+
+    def _beat(self):
+        now = time.monotonic()
+        # Capped so that one suspend or debugger stop does not look like a long overload
+        sample = min(1.0, max(0.0, now - self._last - self.interval))
+        self._last = now
+        self.beats += 1
+        self.max_lag = max(self.max_lag, sample)
+        self.lag += (sample - self.lag) * (0.5 if sample > self.lag else 0.1)
+        instrumentation.gauge('event_loop.lag', self.lag)
+        self.measured.emit(self.lag)
+
+    def stats(self):
+        return {'lag': self.lag, 'max_lag': self.max_lag, 'beats': self.beats, 'users': len(self._users)}
+
+_lag_monitor = None
+
+def lag_monitor():
+    """Return the LagMonitor shared by the adaptive managers of the GUI thread."""
+    global _lag_monitor
+    if _lag_monitor is None:
+        _lag_monitor = LagMonitor()
+    return _lag_monitor
+
+class _NullStage:
+    """Context manager returned by Instrumentation.stage() while instrumentation is disabled."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+class _Stage:
+    __slots__ = ('instrumentation', 'name', 'start')
+
+    def __init__(self, instrumentation, name):
+        self.instrumentation = instrumentation
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.instrumentation._finish(self.name, self.start, time.perf_counter())
+        return False
+
+class Instrumentation:
+    """Opt-in timers, counters and gauges for the notification hot paths.
+
+    Disabled by default; while disabled, stage(), begin() and end() return
+    immediately and nothing is recorded. When enabled, every stage is also kept
+    as a trace event that export_chrome_trace() writes in the Chrome trace-event
+    format (load it in chrome://tracing or Perfetto).
+    """
+    def __init__(self, max_events=100000):
+        self.enabled = False
+        self.max_events = max_events
+        self.reset()
+
+    def reset(self):
+        """Drop every recorded timing, counter, gauge and trace event."""
+        self._stages = {}  # name -> [count, total seconds, max seconds]
+        self.counters = {}
+        self.gauges = {}
+        self._events = deque(maxlen=self.max_events)
+        self._origin = time.perf_counter()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def stage(self, name):
+        """Return a context manager that times the enclosed block as stage name."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def begin(self, name):
+        """Start timing stage name; pass the result to end(). Returns None while disabled."""
+        if not self.enabled:
+            return None
+        return (name, time.perf_counter())
+
+    def end(self, token):
+        """Finish a stage started with begin()."""
+        if token is not None:
+            self._finish(token[0], token[1], time.perf_counter())
+
+    def _finish(self, name, start, end):
+        duration = end - start
+        stage = self._stages.get(name)
+        if stage is None:
+            self._stages[name] = [1, duration, duration]
+        else:
+            stage[0] += 1
+            stage[1] += duration
+            if duration > stage[2]:
+                stage[2] = duration
+        self._events.append(('X', name, start, duration, threading.get_ident()))
+
+    def count(self, name, value=1):
+        """Add value to counter name."""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name, value):
+        """Record the current value of gauge name."""
+        if self.enabled:
+            self.gauges[name] = value
+            self._events.append(('C', name, time.perf_counter(), value, threading.get_ident()))
+
+    def stats(self):
+        """Return per-stage timings in milliseconds, counters and the latest gauge values."""
+        stages = {}
+        for name, (count, total, longest) in self._stages.items():
+            stages[name] = {
+                'count': count,
+                'total_ms': total * 1000,
+                'mean_ms': total / count * 1000,
+                'max_ms': longest * 1000,
+            }
+        return {'stages': stages, 'counters': dict(self.counters), 'gauges': dict(self.gauges)}
+
+    def export_chrome_trace(self, path):
+        """Write the recorded stages and gauges as a Chrome trace-event JSON file."""
+        pid = os.getpid()
+        events = []
+        for phase, name, start, value, tid in self._events:
+            event = {'name': name, 'ph': phase, 'ts': (start - self._origin) * 1e6, 'pid': pid, 'tid': tid}
+            if phase == 'X':
+                event['dur'] = value * 1e6
+                event['cat'] = name.split('.', 1)[0]
+            else:
+                event['args'] = {name: value}
+            events.append(event)
+        with open(path, 'w') as trace_file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, trace_file)
+
+# Shared by every notification class; call instrumentation.enable() to start recording
+instrumentation = Instrumentation()
+
+def _load_svg_renderer(svg_path):
+    """Parse an SVG file, returning None if it is missing or invalid.
+
+    QtSvg is imported on first use so that importing this module stays cheap.
+    """
+    from PyQt5.QtSvg import QSvgRenderer
+    if not os.path.exists(svg_path):
+        print(f"SVG file not found: {svg_path}")
+        return None
+    renderer = QSvgRenderer(svg_path)
+    if not renderer.isValid():
+        print(f"Invalid SVG file: {svg_path}")
+        return None
+    return renderer
+
+def _paint_svg(device, renderer, color):
+    """Render the SVG onto a transparent paint device and fill its shape with color."""
+    device.fill(Qt.transparent)
+    painter = QPainter(device)
+    renderer.render(painter)
+    painter.setCompositionMode(QPainter.CompositionMode_SourceIn)
+    painter.fillRect(device.rect(), QColor(color))
+    painter.end()
+
+def notification_icon_variants():
+    """Return the (svg path, color, size) of every icon the notification widgets draw."""
+    variants = [
+        ('cross_icon.svg', '#ffffff', 16),
+        ('cross_icon.svg', '#ff0000', 16),
+        ('notification.svg', '#FFFFFF', 20),
+    ]
+    for notification_type, color in NOTIFICATION_COLORS.items():
+        variants.append((NOTIFICATION_ICONS[notification_type], color, 20))
+        variants.append(('cross_icon.svg', color, 16))
+    return variants
+
+class _IconPrewarmTask(QtCore.QRunnable):
+    """Thread-pool task that rasterizes icon variants to QImage for an IconCache."""
+    def __init__(self, cache, variants, dpr):
+        super().__init__()
+        self.cache = cache
+        self.variants = variants
+        self.dpr = dpr
+
+    def run(self):
+        # Renderers are not shared across threads, so this task parses its own
+        renderers = {}
+        for svg_path, color, size in self.variants:
+            if svg_path not in renderers:
+                renderers[svg_path] = _load_svg_renderer(svg_path)
+            renderer = renderers[svg_path]
+            if renderer is None:
+                continue
+            device_size = max(1, round(size * self.dpr))
+            image = QtGui.QImage(device_size, device_size, QtGui.QImage.Format_ARGB32_Premultiplied)
+            _paint_svg(image, renderer, color)
+            self.cache._store_prewarmed((svg_path, color.lower(), size, self.dpr), image)
+
+class IconCache:
+    """Process-wide LRU cache of parsed SVG renderers and colored icon pixmaps.
+
+    Pixmaps are keyed on (svg path, color, size, device pixel ratio). Missing or
+    invalid SVG files are remembered as well, so repeated lookups neither stat
+    the file system nor re-parse the SVG. prewarm() rasterizes icons on a worker
+    thread ahead of time; the GUI thread then only converts them to pixmaps.
+    """
+    def __init__(self, max_pixmaps=256, max_renderers=64):
+        self.max_pixmaps = max_pixmaps
+        self.max_renderers = max_renderers
+        self._renderers = OrderedDict()  # svg path -> QSvgRenderer, or None if unusable
+        self._pixmaps = OrderedDict()  # (path, color, size, dpr) -> (QPixmap, QIcon, bytes)
+        self._prewarmed = {}  # (path, color, size, dpr) -> QImage rendered by a worker thread
+        self._prewarm_lock = threading.Lock()
+        self.prewarmed_hits = 0
+        self.hits = 0
+        self.misses = 0
+        self.renderer_hits = 0
+        self.renderer_misses = 0
+        self.evictions = 0
+        self.bytes = 0
+
+    def _renderer(self, svg_path):
+        """Return a cached QSvgRenderer for svg_path, or None if it cannot be used."""
+        if svg_path in self._renderers:
+            self.renderer_hits += 1
+            self._renderers.move_to_end(svg_path)
+            return self._renderers[svg_path]
+        self.renderer_misses += 1
+        renderer = _load_svg_renderer(svg_path)
+        self._renderers[svg_path] = renderer
+        while len(self._renderers) > self.max_renderers:
+            self._renderers.popitem(last=False)
+        return renderer
+
+    def get_pixmap(self, svg_path, color, size, dpr=None):
+        """Return a QPixmap of the SVG filled with color, or a null QPixmap."""
+        return self._lookup(svg_path, color, size, dpr)[0]
+
+    def get_icon(self, svg_path, color, size, dpr=None):
+        """Return a QIcon of the SVG filled with color, or a null QIcon."""
+        return self._lookup(svg_path, color, size, dpr)[1]
+
+    def _lookup(self, svg_path, color, size, dpr):
+        if dpr is None:
+            app = QApplication.instance()
+            dpr = app.devicePixelRatio() if app is not None else 1.0
+        key = (svg_path, color.lower(), size, dpr)
+        entry = self._pixmaps.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._pixmaps.move_to_end(key)
+            return entry
+        self.misses += 1
+        image = None
+        if self._prewarmed:
+            with self._prewarm_lock:
+                image = self._prewarmed.pop(key, None)
+        if image is not None:
+            self.prewarmed_hits += 1
+            entry = self._from_image(image, dpr)
+        else:
+            with instrumentation.stage('icon.rasterize'):
+                entry = self._render(svg_path, color, size, dpr)
+        self._pixmaps[key] = entry
+        self.bytes += entry[2]
+        while len(self._pixmaps) > self.max_pixmaps:
+            _, evicted = self._pixmaps.popitem(last=False)
+            self.bytes -= evicted[2]
+            self.evictions += 1
+        return entry
+
+    def _render(self, svg_path, color, size, dpr):
+        renderer = self._renderer(svg_path)
+        if renderer is None:
+            return QPixmap(), QIcon(), 0
+        device_size = max(1, round(size * dpr))
+        image = QPixmap(device_size, device_size)
+        _paint_svg(image, renderer, color)
+        image.setDevicePixelRatio(dpr)
+
+        return image, QIcon(image), device_size * device_size * image.depth() // 8
+
+    def _from_image(self, image, dpr):
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(dpr)
+        return pixmap, QIcon(pixmap), pixmap.width() * pixmap.height() * pixmap.depth() // 8
+
+    def _store_prewarmed(self, key, image):
+        with self._prewarm_lock:
+            self._prewarmed[key] = image
+
+    def prewarm(self, variants=None, dpr=None, thread_pool=None):
+        """Rasterize icon variants to QImage on a thread-pool worker.
+
+        variants is a list of (svg path, color, size) and defaults to every icon
+        the notification widgets use. Must be called from the GUI thread.
+        """
+        if variants is None:
+            variants = notification_icon_variants()
+        if dpr is None:
+            app = QApplication.instance()
+            dpr = app.devicePixelRatio() if app is not None else 1.0
+        variants = [v for v in variants if (v[0], v[1].lower(), v[2], dpr) not in self._pixmaps]
+        if not variants:
+            return None
+        task = _IconPrewarmTask(self, variants, dpr)
+        (thread_pool or QtCore.QThreadPool.globalInstance()).start(task)
+        return task
+
+    def stats(self):
+        """Return a snapshot of the cache counters."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'renderer_hits': self.renderer_hits,
+            'renderer_misses': self.renderer_misses,
+            'prewarmed_hits': self.prewarmed_hits,
+            'prewarmed_pending': len(self._prewarmed),
+            'evictions': self.evictions,
+            'pixmaps': len(self._pixmaps),
+            'renderers': len(self._renderers),
+            'bytes': self.bytes,
+        }
+
+    def clear(self):
+        """Drop every cached renderer and pixmap."""
+        self._renderers.clear()
+        self._pixmaps.clear()
+        with self._prewarm_lock:
+            self._prewarmed.clear()
+        self.bytes = 0
+
+# Shared by every Notifier and NotificationIcon in the process
+icon_cache = IconCache()
+
+def create_colored_icon(svg_path, color, size, dpr=None):
+    """Create a QIcon from an SVG file with the specified color and size."""
+    return icon_cache.get_icon(svg_path, color, size, dpr)
+
+def prewarm_icons(dpr=None):
+    """Rasterize every notification icon in the background so the first toast only blits."""
+    return icon_cache.prewarm(dpr=dpr)
+
+class TextMeasureCache:
+    """Process-wide LRU cache of elided text and its size, keyed on (text, font, width).
+
+    Relayout of a full stack then costs dictionary lookups instead of text shaping.
+    """
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (text, font key, width) -> (elided text, QSize)
+        self._metrics = {}  # font key -> QFontMetrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def measure(self, text, font, width):
+        """Return (elided text, size hint) for text drawn in font within width pixels."""
+        font_key = font.key()
+        key = (text, font_key, width)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+        self.misses += 1
+        token = instrumentation.begin('text.elide')
+        font_metrics = self._metrics.get(font_key)
+        if font_metrics is None:
+            font_metrics = self._metrics[font_key] = QFontMetrics(font)
+        elided_text = font_metrics.elidedText(text, Qt.ElideRight, width)
+        entry = (elided_text, font_metrics.size(Qt.TextSingleLine, elided_text))
+        instrumentation.end(token)
+        self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def stats(self):
+        """Return a snapshot of the cache counters."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+        }
+
+    def clear(self):
+        """Drop every cached measurement."""
+        self._entries.clear()
+        self._metrics.clear()
+
+# Shared by every Notifier; set text_measure_cache.max_entries to resize it
+text_measure_cache = TextMeasureCache()
+
+class BackgroundCache:
+    """Process-wide LRU cache of pre-rendered rounded-rectangle backgrounds.
+
+    Pixmaps are keyed on (width, height, device pixel ratio, color, radius), so
+    the antialiased corners are rasterized once per distinct size and every
+    repaint of a notification background is a single drawPixmap.
+    """
+    def __init__(self, max_pixmaps=64):
+        self.max_pixmaps = max_pixmaps
+        self._pixmaps = OrderedDict()  # (width, height, dpr, rgba, radius) -> QPixmap
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, size, dpr, color, radius=8):
+        """Return a transparent QPixmap of size logical pixels holding a filled rounded rectangle."""
+        key = (size.width(), size.height(), dpr, color.rgba(), radius)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self.hits += 1
+            self._pixmaps.move_to_end(key)
+            return pixmap
+        self.misses += 1
+        token = instrumentation.begin('background.render')
+        pixmap = QPixmap(max(1, round(size.width() * dpr)), max(1, round(size.height() * dpr)))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setBrush(color)
+        painter.setPen(Qt.NoPen)
+        painter.drawRoundedRect(QtCore.QRectF(0, 0, size.width(), size.height()), radius, radius)
+        painter.end()
+        instrumentation.end(token)
+        self._pixmaps[key] = pixmap
+        while len(self._pixmaps) > self.max_pixmaps:
+            self._pixmaps.popitem(last=False)
+            self.evictions += 1
+        return pixmap
+
+    def stats(self):
+        """Return a snapshot of the cache counters."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'pixmaps': len(self._pixmaps),
+            'max_pixmaps': self.max_pixmaps,
+        }
+
+    def clear(self):
+        """Drop every cached background."""
+        self._pixmaps.clear()
+
+# Shared by every Notifier, NotificationIcon and NotificationOverlay
+background_cache = BackgroundCache()
+
+class NotificationStyles:
+    """Styling resources shared by every notification widget, built once per process.
+
+    Colors and fonts are precomputed, and all notification widgets are styled by
+    one application-level style sheet whose per-type rules are keyed on the
+    notificationType dynamic property. Changing a notification's type is then a
+    property change and a re-polish of one label instead of a style sheet parse.
+    Every rule is scoped to this module's widget classes, so it cannot match
+    host widgets that happen to use the same object names.
+    """
+    STYLE_SHEET_MARKER = '/* notification.py styles */'
+
+    def __init__(self):
+        self.text_font = QtGui.QFont(QApplication.font())
+        self.bold_font = QtGui.QFont(self.text_font)
+        self.bold_font.setBold(True)
+        self.count_font = QtGui.QFont(self.bold_font)
+        self.count_font.setPixelSize(14)
+        self.background = QColor('#333333')
+        self.colors = {notification_type: QColor(color) for notification_type, color in NOTIFICATION_COLORS.items()}
+
+        self.installed_for = None  # QApplication whose style sheet install() last extended
+
+        # Qt matches PyQt subclasses by their Python class name
+        rules = [
+            self.STYLE_SHEET_MARKER,
+            "Notifier#notification { font-size: 14px; }",
+            "Notifier QPushButton#notificationClose { border: none; background: transparent; }",
+            "Notifier QLabel#notificationRepeat, NotificationIcon QLabel#notificationCount { color: #FFFFFF; }",
+            "NotificationHistoryView#notificationHistory { background-color: #333333; border: none; }",
+        ]
+        for notification_type, color in NOTIFICATION_COLORS.items():
+            rules.append(
+                f'Notifier QLabel#notificationText[notificationType="{notification_type}"] {{ color: {color}; }}')
+        self.style_sheet = "\n".join(rules)
+
+    def color(self, notification_type):
+        """Return the shared QColor for a notification type."""
+        return self.colors.get(notification_type, self.colors[NotificationType.INFO])
+
+    def install(self):
+        """Append the notification rules to the application-wide style sheet if they are missing.
+
+        This changes the style sheet of the whole QApplication, which re-polishes
+        every widget in it, so notification_styles() only does it once per
+        application. Call it again after replacing the application style sheet.
+        """
+        app = QApplication.instance()
+        if app is None:
+            return
+        self.installed_for = app
+        current = app.styleSheet()
+        if self.STYLE_SHEET_MARKER not in current:
+            app.setStyleSheet(f"{current}\n{self.style_sheet}" if current else self.style_sheet)
+
+_notification_styles = None
+
+def notification_styles():
+    """Return the process-wide NotificationStyles.
+
+    Its rules are added to the application-wide style sheet the first time
+    this is called with a QApplication; see NotificationStyles.install().
+    """
+    global _notification_styles
+    if _notification_styles is None:
+        _notification_styles = NotificationStyles()
+    if _notification_styles.installed_for is not QApplication.instance():
+        _notification_styles.install()
+    return _notification_styles
+
+def _paint_progress(painter, rect, progress, color):
+    """Draw a progress bar along the bottom edge of a notification's rounded rectangle."""
+    inner = rect.width() - 16  # Stay clear of the rounded corners
+    painter.setPen(Qt.NoPen)
+    painter.setBrush(QColor(255, 255, 255, 40))
+    painter.drawRect(rect.x() + 8, rect.bottom() - 3, inner, 3)
+    painter.setBrush(color)
+    painter.drawRect(rect.x() + 8, rect.bottom() - 3, int(inner * min(1.0, max(0.0, progress))), 3)
+
+def _application_window(widget):
+    """Return the application window a toast or count badge belongs to, or widget itself.
+
+    Toasts and badges are top-level windows too and may be the active window,
+    but notifications are never stacked on them.
+    """
+    while isinstance(widget, (Notifier, NotificationIcon)):
+        widget = widget.parent
+    return widget
+
 class Notifier(QWidget):
-    def __init__(self, parent, message, notification_type=NotificationType.INFO, auto_hide=True, close_callback=None):
+    live_count = 0  # Notifiers constructed and not yet handed to deleteLater
+
+    def __init__(self, parent, message, notification_type=NotificationType.INFO, auto_hide=True, close_callback=None, pool=None,
+                 expiry=None, show_icon=True):
+        token = instrumentation.begin('notifier.construct')
+        Notifier.live_count += 1
         # Use QApplication's active window if parent is None
         if parent is None:
-            parent = QApplication.activeWindow()
+            parent = _application_window(QApplication.activeWindow())
         super().__init__(parent)
 
         self.auto_hide = auto_hide
         self.close_callback = close_callback
+        self.pool = pool  # NotifierPool that recycles this widget, if any
+        self.in_pool = False  # True while parked in the pool
         self.original_message = message
         self.notification_type = notification_type
+        self.original_type = notification_type  # Type to restore after showing the "more" summary
         self.parent = parent  # Store reference to parent
         self.is_more_notifications = False  # Flag to identify "more notifications" message
+        self.repeat_count = 1  # Number of identical notifications folded into this one
+        self.coalesce_key = None
+        self.display_text = message  # Full text to show; the label holds the elided version
+        self.progress = None  # Fraction drawn as a progress bar, or None for no bar
+        self._size_key = None  # Inputs of the last adjust_size, to skip re-measuring
+        self._styled_type = None  # Type the widgets are currently styled for
+        self.show_icon = show_icon  # False leaves out the type icon, which is then never rendered
 
         self.maxWidth = 300
 
-        self.setStyleSheet("""
-            QWidget#notification {
-                font-size: 14px;
-            }
-        """)
+        # Styling comes from the shared application style sheet, matched by object name
+        self.styles = notification_styles()
         self.setObjectName("notification")
 
         # Enable window drop shadow and translucent background
@@ -55,12 +1315,7 @@ class Notifier(QWidget):
         self.close_button = QPushButton(self)
         self.close_button.setFixedSize(16, 16)
         self.close_button.setCursor(Qt.PointingHandCursor)
-        self.close_button.setStyleSheet("""
-            QPushButton {
-                border: none;
-                background: transparent;
-            }
-        """)
+        self.close_button.setObjectName("notificationClose")
         # Load the SVG icon and create normal and hover pixmaps
         self.close_icon = self.create_colored_icon('cross_icon.svg', '#ffffff', size=16)
         self.close_icon_hover = self.create_colored_icon('cross_icon.svg', '#ff0000', size=16)
@@ -77,9 +1332,12 @@ class Notifier(QWidget):
         self.icon_label = QLabel(self)
         self.icon_label.setFixedSize(20, 20)  # Reduced size from 24 to 20
         self.icon_label.setAlignment(Qt.AlignCenter)
+        if not show_icon:
+            self.icon_label.hide()
 
         # Add label to display the message
         self.label = QLabel(self)
+        self.label.setObjectName("notificationText")
         self.label.setWordWrap(False)
         self.label.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
         self.label.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Preferred)
@@ -87,47 +1345,47 @@ class Notifier(QWidget):
         # Set tooltip on the label to display the full message
         self.label.setToolTip(self.original_message)
 
-        # Layout for the icon, label, and close button
+        # Add label to display the repeat counter, hidden until a repeat is folded in
+        self.repeat_label = QLabel(self)
+        self.repeat_label.setObjectName("notificationRepeat")
+        self.repeat_label.setFont(self.styles.bold_font)
+        self.repeat_label.setAlignment(Qt.AlignCenter)
+        self.repeat_label.hide()
+
+        # Layout for the icon, label, repeat counter and close button
         layout = QHBoxLayout()
         layout.addWidget(self.icon_label)
         layout.addWidget(self.label)
+        layout.addWidget(self.repeat_label)
         layout.addWidget(self.close_button)
         layout.setContentsMargins(15, 10, 15, 10)
         layout.setSpacing(10)
         self.setLayout(layout)
 
-        # Initialize timer but do not start it yet
-        self.timer = None
-        self.timer_started = False  # Flag to track if the timer has been started
+        # Auto-hide countdown, run by an ExpiryScheduler once the notification is first shown
+        self.expiry = expiry  # Scheduler of the owning manager; None uses the shared one
+        self.duration = AUTO_HIDE_DURATION
+        self.timer_started = False  # Flag to track if the countdown has been started
 
         # Set the message and style
         self.set_message(message, notification_type)
         self.apply_notification_style()
+        instrumentation.end(token)
 
     def apply_notification_style(self):
         """Apply styles based on the notification type."""
-        # Define colors for each notification type (text color only)
-        colors = {
-            NotificationType.SUCCESS: '#C5E384',  # Metallic Green
-            NotificationType.INFO: '#8ED2F9',     # Metallic Blue
-            NotificationType.ERROR: '#FF474C',    # Metallic Red
-            NotificationType.WARNING: '#FDD017',  # Metallic Yellow/Gold
-            NotificationType.MORE: '#D1D8DD'      # Metallic Silver
-        }
-
-        icons = {
-            NotificationType.SUCCESS: 'success.svg',
-            NotificationType.INFO: 'info.svg',
-            NotificationType.ERROR: 'error.svg',
-            NotificationType.WARNING: 'warn.svg',
-            NotificationType.MORE: 'notification.svg'
-        }
-
-        color = colors.get(self.notification_type, colors[NotificationType.INFO])
-        icon_path = icons.get(self.notification_type, 'info.svg')
+        if self.notification_type == self._styled_type:
+            return
+        token = instrumentation.begin('notifier.style')
+        self._styled_type = self.notification_type
+        color = NOTIFICATION_COLORS.get(self.notification_type, NOTIFICATION_COLORS[NotificationType.INFO])
+        icon_path = NOTIFICATION_ICONS.get(self.notification_type, 'info.svg')
 
-        # Set text color
-        self.label.setStyleSheet(f"color: {color};")
+        # Set text color through the notificationType rules of the shared style sheet
+        style_type = self.notification_type if self.notification_type in NOTIFICATION_COLORS else NotificationType.INFO
+        self.label.setProperty('notificationType', style_type)
+        self.label.style().unpolish(self.label)
+        self.label.style().polish(self.label)
 
         # Update the close button icon color
         self.close_icon = self.create_colored_icon('cross_icon.svg', color, size=16)
@@ -139,46 +1397,33 @@ class Notifier(QWidget):
             self.close_button.setIconSize(self.close_button.size())
 
         # Set the icon label pixmap
-        icon = self.create_colored_icon(icon_path, color, size=20)  # Reduced size from 24 to 20
-        if not icon or icon.isNull():
-            # Use a placeholder or Unicode character if icon not found
-            self.icon_label.setText('❓')
-        else:
-            self.icon_label.setPixmap(icon.pixmap(20, 20))  # Adjusted size
+        if self.show_icon:
+            icon = self.create_colored_icon(icon_path, color, size=20)  # Reduced size from 24 to 20
+            if not icon or icon.isNull():
+                # Use a placeholder or Unicode character if icon not found
+                self.icon_label.setText('❓')
+            else:
+                self.icon_label.setPixmap(icon.pixmap(20, 20))  # Adjusted size
+        instrumentation.end(token)
 
     def paintEvent(self, event):
         """Draw the background with rounded corners."""
+        token = instrumentation.begin('paint.notifier')
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
         rect = self.rect()
 
-        # Draw background
-        painter.setBrush(QColor('#333333'))
-        painter.setPen(Qt.NoPen)
-        painter.drawRoundedRect(rect, 8, 8)
+        # Draw the pre-rendered background
+        painter.drawPixmap(0, 0, background_cache.get(rect.size(), self.devicePixelRatioF(), self.styles.background))
+
+        if self.progress is not None and not self.is_more_notifications:
+            _paint_progress(painter, rect, self.progress, self.styles.color(self.notification_type))
 
         # Note: Colored border removed as per request
+        instrumentation.end(token)
 
     def create_colored_icon(self, svg_path, color, size):
         """Create a QIcon from an SVG file with the specified color and size."""
-        if not os.path.exists(svg_path):
-            print(f"SVG file not found: {svg_path}")
-            return QIcon()
-        renderer = QSvgRenderer(svg_path)
-        if not renderer.isValid():
-            print(f"Invalid SVG file: {svg_path}")
-            return QIcon()
-        img_size = QtCore.QSize(size, size)
-        image = QPixmap(img_size)
-        image.fill(Qt.transparent)
-
-        painter = QPainter(image)
-        renderer.render(painter)
-        painter.setCompositionMode(QPainter.CompositionMode_SourceIn)
-        painter.fillRect(image.rect(), QColor(color))
-        painter.end()
-
-        return QIcon(image)
+        return create_colored_icon(svg_path, color, size, self.devicePixelRatioF())
 
     def eventFilter(self, obj, event):
         if obj == self.close_button:
@@ -190,67 +1435,268 @@ class Notifier(QWidget):
 
     def set_message(self, message, notification_type=None):
         """Set the notification message with text elision and adjust its size."""
-        self.label.setText(message)
+        self.display_text = message
         self.label.setToolTip(self.original_message)
         if notification_type:
             self.notification_type = notification_type
             self.apply_notification_style()
-        self.adjust_size()
 
         # Set flag if this is the "more notifications" message
         self.is_more_notifications = self.notification_type == NotificationType.MORE
+        if self.is_more_notifications:
+            self.label.setToolTip(message)
+        self._update_repeat_label()
+        self.adjust_size()
+
+    def set_repeat_count(self, count):
+        """Show how many identical notifications have been folded into this one."""
+        self.repeat_count = count
+        self._update_repeat_label()
+        self.adjust_size()
+
+    def set_progress(self, progress):
+        """Show progress as a fraction from 0 to 1, or remove the bar with None."""
+        if progress == self.progress:
+            return
+        self.progress = progress
+        self.update()
+
+    def set_show_icon(self, show):
+        """Show or leave out the type icon; a left-out icon is not rendered."""
+        if show == self.show_icon:
+            return
+        self.show_icon = show
+        self.icon_label.setVisible(show)
+        if show:
+            # Render the icon that was skipped while it was left out
+            self._styled_type = None
+            self.apply_notification_style()
+
+    def _update_repeat_label(self):
+        if self.repeat_count > 1 and not self.is_more_notifications:
+            self.repeat_label.setText(f"×{self.repeat_count}")
+            self.repeat_label.show()
+        else:
+            self.repeat_label.hide()
+
+    def refresh_auto_hide(self):
+        """Extend the auto-hide countdown to a full duration if it is already running."""
+        if self.timer_started:
+            self.expiry_scheduler().extend(self, self.duration)
+
+    def expiry_scheduler(self):
+        return self.expiry if self.expiry is not None else expiry_scheduler()
+
+    def cancel_auto_hide(self):
+        """Stop the auto-hide countdown so it cannot fire after the widget is released."""
+        if self.timer_started:
+            self.expiry_scheduler().cancel(self)
+            self.timer_started = False
+
+    def enterEvent(self, event):
+        # Keep the notification up while the pointer is over it
+        if self.timer_started:
+            self.expiry_scheduler().pause(self)
+        super().enterEvent(event)
+
+    def leaveEvent(self, event):
+        if self.timer_started:
+            self.expiry_scheduler().resume(self)
+        super().leaveEvent(event)
 
     def adjust_size(self):
-        """Adjust the size of the notification frame based on content."""
+        """Adjust the size of the notification frame based on content.
+
+        Only re-measures when the text, type, repeat counter or parent width changed.
+        """
         # Adjust maxWidth based on parent width to prevent overflow
         parent_width = self.parent.width() if self.parent else self.maxWidth
+        repeat_text = None if self.repeat_label.isHidden() else self.repeat_label.text()
+        size_key = (self.display_text, self.notification_type, repeat_text, parent_width)
+        if size_key == self._size_key:
+            return
+        self._size_key = size_key
+        token = instrumentation.begin('notifier.adjust_size')
         self.maxWidth = min(300, parent_width - 40)
 
         self.setFixedWidth(self.maxWidth)
         label_max_width = self.maxWidth - self.close_button.width() - self.icon_label.width() - 50  # Adjusted for icon
+        if not self.repeat_label.isHidden():
+            label_max_width -= self.repeat_label.sizeHint().width() + 10  # 10 for spacing
 
         self.label.setMaximumWidth(label_max_width)
 
-        # Use QFontMetrics to elide text as needed
-        font_metrics = QFontMetrics(self.label.font())
-        elided_text = font_metrics.elidedText(self.label.text(), Qt.ElideRight, label_max_width)
+        # Elide the full text as needed; measurements are shared through text_measure_cache
+        elided_text, text_size = text_measure_cache.measure(self.display_text, self.label.font(), label_max_width)
         self.label.setText(elided_text)
 
-        self.label.adjustSize()
+        self.label.resize(text_size)
         self.setFixedHeight(max(self.label.height(), self.icon_label.height(), self.close_button.height()) + 20)
+        instrumentation.end(token)
 
     def show_notification(self):
         """Show the notification."""
         self.adjust_size()
         self.show()
+        self.start_auto_hide()
 
-        # Start the auto-hide timer when the notification is shown for the first time
+    def start_auto_hide(self):
+        """Start the auto-hide countdown, unless it was already started."""
         if self.auto_hide and not self.timer_started:
-            if self.timer is None:
-                self.timer = QTimer(self)
-                self.timer.setSingleShot(True)
-                self.timer.timeout.connect(self.close_notification)
-            self.timer.start(5000)
+            self.expiry_scheduler().schedule(self, self.duration)
             self.timer_started = True
 
     def hide_notification(self):
         """Hide the notification without deleting it."""
         self.hide()
-        # Do not stop the timer; it should continue running
+        # Do not stop the countdown; it should continue running
 
     def close_notification(self):
         """Close the notification."""
+        if self.in_pool:
+            return
         self.hide()
         if self.close_callback:
             self.close_callback(self)
-        self.deleteLater()
+        self.dispose()
+
+    def dispose(self):
+        """Hand the widget back to its pool, or delete it if it is not pooled."""
+        if self.pool is not None:
+            self.pool.release(self)
+        else:
+            self.cancel_auto_hide()
+            Notifier.live_count -= 1
+            self.deleteLater()
+
+    def reset(self, message, notification_type=NotificationType.INFO, auto_hide=True, close_callback=None,
+              show_icon=True):
+        """Rebind a recycled notification to a new message, type and callback."""
+        self.cancel_auto_hide()
+        self.set_show_icon(show_icon)
+        self.duration = AUTO_HIDE_DURATION
+        self.in_pool = False
+        self.auto_hide = auto_hide
+        self.close_callback = close_callback
+        self.original_message = message
+        self.original_type = notification_type
+        self.repeat_count = 1
+        self.coalesce_key = None
+        self.progress = None
+        self.set_message(message, notification_type)
+
+class NotifierPool:
+    """Bounded pool of pre-built Notifier widgets that are recycled instead of deleted.
+
+    One pool can serve several windows: a pooled widget is moved to the window
+    that acquires it. Pooled widgets deleted along with their old window are
+    skipped.
+    """
+    def __init__(self, parent, max_size=8):
+        self.parent = parent  # Default window for acquire() and warm_up()
+        self.max_size = max_size
+        self._free = []
+        self.created = 0
+        self.reused = 0
+        self.released = 0
+        self.discarded = 0
+        self.reparented = 0
+
+    def acquire(self, message, notification_type=NotificationType.INFO, auto_hide=True, close_callback=None,
+                parent=None, show_icon=True):
+        """Return a Notifier for parent bound to message, reusing a pooled widget when one is free."""
+        if parent is None:
+            parent = self.parent
+        while self._free:
+            notifier = self._free.pop()
+            if sip.isdeleted(notifier):
+                # Deleted by Qt together with the window it was last shown on
+                Notifier.live_count -= 1
+                self.discarded += 1
+                continue
+            if notifier.parent is not parent:
+                notifier.setParent(parent, notifier.windowFlags())
+                notifier.parent = parent
+                self.reparented += 1
+            notifier.reset(message, notification_type, auto_hide, close_callback, show_icon)
+            self.reused += 1
+            return notifier
+        self.created += 1
+        return Notifier(
+            parent,
+            message,
+            notification_type=notification_type,
+            auto_hide=auto_hide,
+            close_callback=close_callback,
+            pool=self,
+            show_icon=show_icon
+        )
+
+    def release(self, notifier):
+        """Park a closed Notifier for reuse, deleting it if the pool is full."""
+        if notifier.in_pool:
+            return
+        notifier.cancel_auto_hide()
+        notifier.hide()
+        notifier.close_callback = None
+        self.released += 1
+        if len(self._free) < self.max_size:
+            notifier.in_pool = True
+            self._free.append(notifier)
+        else:
+            notifier.pool = None
+            Notifier.live_count -= 1
+            notifier.deleteLater()
+            self.discarded += 1
+
+    def warm_up(self, count=None):
+        """Pre-build notifiers so the first notifications do not pay construction cost."""
+        count = self.max_size if count is None else min(count, self.max_size)
+        while len(self._free) < count:
+            notifier = Notifier(self.parent, '', pool=self)
+            notifier.hide()
+            notifier.in_pool = True
+            self._free.append(notifier)
+            self.created += 1
+
+    def clear(self):
+        """Delete every pooled widget."""
+        for notifier in self._free:
+            Notifier.live_count -= 1
+            if not sip.isdeleted(notifier):
+                notifier.pool = None
+                notifier.deleteLater()
+        self._free.clear()
+
+    def stats(self):
+        """Return a snapshot of the pool counters."""
+        acquired = self.created + self.reused
+        return {
+            'free': len(self._free),
+            'max_size': self.max_size,
+            'created': self.created,
+            'reused': self.reused,
+            'released': self.released,
+            'discarded': self.discarded,
+            'reparented': self.reparented,
+            'reuse_rate': self.reused / acquired if acquired else 0.0,
+        }
+
+_shared_notifier_pool = None
+
+def shared_notifier_pool():
+    """Return the process-wide NotifierPool used by the per-window managers of get_instance()."""
+    global _shared_notifier_pool
+    if _shared_notifier_pool is None:
+        _shared_notifier_pool = NotifierPool(None, max_size=16)
+    return _shared_notifier_pool
 
 class NotificationIcon(QWidget):
     """Widget to display a notification icon with the number of notifications."""
     def __init__(self, parent, notification_manager):
         # Use QApplication's active window if parent is None
         if parent is None:
-            parent = QApplication.activeWindow()
+            parent = _application_window(QApplication.activeWindow())
         super().__init__(parent)
         self.parent = parent
         self.notification_manager = notification_manager
@@ -258,6 +1704,8 @@ class NotificationIcon(QWidget):
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.Tool)
         self.setAttribute(Qt.WA_TranslucentBackground)
         self.setAttribute(Qt.WA_TransparentForMouseEvents, False)
+        self._count = None  # Count currently displayed
+        self.styles = notification_styles()
 
         # Layout
         layout = QHBoxLayout()
@@ -278,7 +1726,8 @@ class NotificationIcon(QWidget):
 
         # Count label
         self.count_label = QLabel(self)
-        self.count_label.setStyleSheet("color: #FFFFFF; font-weight: bold; font-size: 14px;")
+        self.count_label.setObjectName("notificationCount")
+        self.count_label.setFont(self.styles.count_font)
         self.count_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(self.count_label)
 
@@ -288,28 +1737,14 @@ class NotificationIcon(QWidget):
 
     def create_colored_icon(self, svg_path, color, size):
         """Create a QIcon from an SVG file with the specified color and size."""
-        if not os.path.exists(svg_path):
-            print(f"SVG file not found: {svg_path}")
-            return QIcon()
-        renderer = QSvgRenderer(svg_path)
-        if not renderer.isValid():
-            print(f"Invalid SVG file: {svg_path}")
-            return QIcon()
-        img_size = QtCore.QSize(size, size)
-        image = QPixmap(img_size)
-        image.fill(Qt.transparent)
-
-        painter = QPainter(image)
-        renderer.render(painter)
-        painter.setCompositionMode(QPainter.CompositionMode_SourceIn)
-        painter.fillRect(image.rect(), QColor(color))
-        painter.end()
-
-        return QIcon(image)
+        return create_colored_icon(svg_path, color, size, self.devicePixelRatioF())
 
     def update_count(self):
         """Update the notification count displayed."""
         total_notifications = len(self.notification_manager.active_notifications) + len(self.notification_manager.notification_queue)
+        if total_notifications == self._count:
+            return
+        self._count = total_notifications
         self.count_label.setText(str(total_notifications))
         self.adjust_size()
         self.adjust_position()
@@ -333,38 +1768,1019 @@ class NotificationIcon(QWidget):
         x_offset = x + width - self.width() - 20  # 20 px margin
         y_offset = y + 20  # 20 px from top
 
-        self.move(x_offset, y_offset)
+        if self.x() != x_offset or self.y() != y_offset:
+            self.move(x_offset, y_offset)
 
     def paintEvent(self, event):
         """Draw the background with rounded corners."""
+        token = instrumentation.begin('paint.icon')
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
         rect = self.rect()
 
-        # Draw background
-        painter.setBrush(QColor('#333333'))
-        painter.setPen(Qt.NoPen)
-        painter.drawRoundedRect(rect, 8, 8)
+        # Draw the pre-rendered background
+        painter.drawPixmap(0, 0, background_cache.get(rect.size(), self.devicePixelRatioF(), self.styles.background))
 
         # Note: Colored border removed as per request
+        instrumentation.end(token)
 
-class NotificationManager(QtCore.QObject):
-    _instance = None  # Class variable to hold the singleton instance
+class HeadlessNotification:
+    """A notification with the interface NotificationManager uses but no on-screen presence.
+
+    Shown by HeadlessBackend, which it tells about every change, and the base
+    of OverlayCard, which adds geometry and painting.
+    """
+    def __init__(self, message, notification_type=NotificationType.INFO, auto_hide=True, close_callback=None,
+                 backend=None):
+        self.backend = backend
+        self.auto_hide = auto_hide
+        self.close_callback = close_callback
+        self.in_pool = False  # Not pooled; kept for interface parity with Notifier
+        self.original_message = message
+        self.notification_type = notification_type
+        self.original_type = notification_type
+        self.is_more_notifications = notification_type == NotificationType.MORE
+        self.repeat_count = 1
+        self.coalesce_key = None
+        self.display_text = message
+        self.progress = None
+        self.show_icon = True
+        self.closed = False
+        self._hidden = True
+
+        # Auto-hide countdown, run by an ExpiryScheduler once the notification is first shown
+        self.expiry = None  # Scheduler of the owning manager; None uses the shared one
+        self.duration = AUTO_HIDE_DURATION
+        self.timer_started = False
+
+    def _changed(self, event):
+        """Report 'show', 'hide', 'update' or 'close' to the backend."""
+        if self.backend is not None:
+            self.backend.notification_changed(self, event)
+
+    def set_message(self, message, notification_type=None):
+        """Set the notification message and type."""
+        if message == self.display_text and (not notification_type or notification_type == self.notification_type):
+            return
+        self.display_text = message
+        if notification_type:
+            self.notification_type = notification_type
+        self.is_more_notifications = self.notification_type == NotificationType.MORE
+        self.adjust_size()
+        self._changed('update')
+
+    def set_repeat_count(self, count):
+        """Show how many identical notifications have been folded into this one."""
+        self.repeat_count = count
+        self.adjust_size()
+        self._changed('update')
+
+    def set_progress(self, progress):
+        """Show progress as a fraction from 0 to 1, or remove it with None."""
+        if progress == self.progress:
+            return
+        self.progress = progress
+        self._changed('update')
+
+    def set_show_icon(self, show):
+        """Show or leave out the type icon."""
+        self.show_icon = show
+
+    def refresh_auto_hide(self):
+        """Extend the auto-hide countdown to a full duration if it is already running."""
+        if self.timer_started:
+            self.expiry_scheduler().extend(self, self.duration)
+
+    def expiry_scheduler(self):
+        return self.expiry if self.expiry is not None else expiry_scheduler()
+
+    def pause_auto_hide(self):
+        if self.timer_started:
+            self.expiry_scheduler().pause(self)
+
+    def resume_auto_hide(self):
+        if self.timer_started:
+            self.expiry_scheduler().resume(self)
+
+    def tooltip(self):
+        return self.display_text if self.is_more_notifications else self.original_message
 
-    def __init__(self, parent=None, max_notifications=3, auto_hide=True):
+    def repeat_text(self):
+        if self.repeat_count > 1 and not self.is_more_notifications:
+            return f"×{self.repeat_count}"
+        return None
+
+    def adjust_size(self):
+        """Recompute the size after a change; nothing to do without a screen."""
+
+    # Geometry and visibility, named after their QWidget counterparts
+    def x(self):
+        return 0
+
+    def y(self):
+        return 0
+
+    def width(self):
+        return 0
+
+    def height(self):
+        return 0
+
+    def move(self, x, y):
+        pass
+
+    def isHidden(self):
+        return self._hidden
+
+    def show(self):
+        self._hidden = False
+        self._changed('show')
+
+    def hide(self):
+        self._hidden = True
+        self._changed('hide')
+
+    def show_notification(self):
+        """Show the notification."""
+        self.adjust_size()
+        self.show()
+        self.start_auto_hide()
+
+    def start_auto_hide(self):
+        """Start the auto-hide countdown, unless it was already started."""
+        if self.auto_hide and not self.timer_started:
+            self.expiry_scheduler().schedule(self, self.duration)
+            self.timer_started = True
+
+    def hide_notification(self):
+        """Hide the notification without deleting it."""
+        self.hide()
+
+    def close_notification(self):
+        """Close the notification."""
+        if self.closed:
+            return
+        self.hide()
+        if self.close_callback:
+            self.close_callback(self)
+        self.dispose()
+
+    def dispose(self):
+        """Release the notification; it cannot be shown again."""
+        if self.closed:
+            return
+        self.closed = True
+        self.close_callback = None
+        if self.timer_started:
+            self.expiry_scheduler().cancel(self)
+            self.timer_started = False
+        self._changed('close')
+
+def _close_rect(rect):
+    """Rectangle of the close button of a card occupying rect."""
+    return QtCore.QRect(rect.right() - 15 - 16 + 1, rect.center().y() - 8, 16, 16)
+
+class OverlayCard(HeadlessNotification):
+    """A notification drawn by a NotificationOverlay instead of owning a window.
+
+    Geometry is in the overlay's (that is, the parent window's) coordinates.
+    """
+    def __init__(self, overlay, message, notification_type=NotificationType.INFO, auto_hide=True, close_callback=None):
+        super().__init__(message, notification_type, auto_hide, close_callback)
+        self.overlay = overlay
+        self.elided_text = message
+        self.pixmap = None  # Whole card rendered by an overlay with cache_cards, and the state it shows
+        self.pixmap_key = None
+        self.rect = QtCore.QRect(0, 0, 0, 0)
+        self._size_key = None
+        self.adjust_size()
+
+    def _changed(self, event):
+        if event == 'close':
+            self.overlay.remove_card(self)
+        else:
+            self.overlay.update_card(self)
+
+    def adjust_size(self):
+        """Measure the card; only re-measures when its text, type or the parent width changed."""
+        parent_width = self.overlay.parent_widget.width()
+        repeat_text = self.repeat_text()
+        size_key = (self.display_text, self.notification_type, repeat_text, parent_width)
+        if size_key == self._size_key:
+            return
+        self._size_key = size_key
+        width = min(300, parent_width - 40)
+        text_width = width - 16 - 20 - 50  # Close button, icon, margins and spacing
+        if repeat_text:
+            text_width -= text_measure_cache.measure(repeat_text, self.overlay.repeat_font, width)[1].width() + 10
+        self.elided_text, text_size = text_measure_cache.measure(self.display_text, self.overlay.card_font, text_width)
+        old_rect = QtCore.QRect(self.rect)
+        self.rect.setSize(QtCore.QSize(width, max(text_size.height(), 20, 16) + 20))
+        self.overlay.update_card(self, old_rect)
+
+    def set_show_icon(self, show):
+        if show != self.show_icon:
+            self.show_icon = show
+            self.overlay.update_card(self)
+
+    def close_rect(self):
+        """Rectangle of the close button in overlay coordinates."""
+        return _close_rect(self.rect)
+
+    def x(self):
+        return self.rect.x()
+
+    def y(self):
+        return self.rect.y()
+
+    def width(self):
+        return self.rect.width()
+
+    def height(self):
+        return self.rect.height()
+
+    def move(self, x, y):
+        old_rect = QtCore.QRect(self.rect)
+        self.rect.moveTo(x, y)
+        self.overlay.update_card(self, old_rect)
+
+class NotificationOverlay(QWidget):
+    """Transparent child widget that paints every notification card of a window in one pass.
+
+    Avoids a native top-level window per notification. Only the card rectangles
+    accept mouse input; clicks elsewhere fall through to the window below.
+    With cache_cards, each card is rendered once into a pixmap that is only
+    redrawn when its text, type, size, progress or hover state changes.
+    """
+    def __init__(self, parent, cache_cards=False):
+        super().__init__(parent)
+        self.parent_widget = parent
+        self.cache_cards = cache_cards
+        self.cards_rendered = 0
+        self.cards = {}  # Insertion-ordered set of OverlayCard
+        self._hover_card = None
+        self._hover_close = False
+        self.setMouseTracking(True)
+        self.setAttribute(Qt.WA_NoSystemBackground)
+
+        self.styles = notification_styles()
+        self.card_font = self.styles.text_font
+        self.repeat_font = self.styles.bold_font
+
+        # Mask and repaint are synchronized once per event-loop turn
+        self._dirty_region = QtGui.QRegion()
+        self._sync_timer = QTimer(self)
+        self._sync_timer.setSingleShot(True)
+        self._sync_timer.setInterval(0)
+        self._sync_timer.timeout.connect(self._sync)
+
+        self.setGeometry(parent.rect())
+        self.hide()
+
+    def create_card(self, message, notification_type=NotificationType.INFO, auto_hide=True, close_callback=None):
+        """Create a card drawn by this overlay."""
+        card = OverlayCard(self, message, notification_type, auto_hide, close_callback)
+        self.cards[card] = None
+        return card
+
+    def remove_card(self, card):
+        self.cards.pop(card, None)
+        if self._hover_card is card:
+            self._hover_card = None
+            self._hover_close = False
+        self.update_card(card)
+
+    def update_card(self, card, old_rect=None):
+        """Mark a card's old and new area for repaint and the input mask for refresh."""
+        if card not in self.cards:
+            return
+        self._dirty_region += card.rect
+        if old_rect is not None:
+            self._dirty_region += old_rect
+        if not self._sync_timer.isActive():
+            self._sync_timer.start()
+
+    def sync_geometry(self):
+        """Cover the whole parent window and stay above its other children."""
+        rect = self.parent_widget.rect()
+        if self.geometry() != rect:
+            self.setGeometry(rect)
+        self.raise_()
+
+    def _sync(self):
+        region = QtGui.QRegion()
+        for card in self.cards:
+            if not card.isHidden():
+                region += card.rect
+        if region.isEmpty():
+            self.hide()
+        else:
+            self.setMask(region)
+            if self.isHidden():
+                self.sync_geometry()
+                self.show()
+        self.update(self._dirty_region)
+        self._dirty_region = QtGui.QRegion()
+
+    def card_at(self, pos):
+        """Return the visible card under pos, or None."""
+        for card in self.cards:
+            if not card.isHidden() and card.rect.contains(pos):
+                return card
+        return None
+
+    def paintEvent(self, event):
+        """Draw every visible card that intersects the exposed area."""
+        token = instrumentation.begin('paint.overlay')
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        exposed = event.rect()
+        dpr = self.devicePixelRatioF()
+        for card in self.cards:
+            if not card.isHidden() and card.rect.intersects(exposed):
+                self._paint_card(painter, card, dpr)
+        painter.end()
+        instrumentation.end(token)
+
+    def _paint_card(self, painter, card, dpr):
+        hovered = card is self._hover_card and self._hover_close
+        if not self.cache_cards:
+            self._draw_card(painter, card, card.rect, dpr, hovered)
+            return
+        size = card.rect.size()
+        key = (size.width(), size.height(), dpr, hovered, card.notification_type, card.elided_text,
+               card.repeat_text(), card.progress, card.show_icon)
+        if card.pixmap_key != key:
+            token = instrumentation.begin('overlay.card_render')
+            pixmap = QPixmap(max(1, round(size.width() * dpr)), max(1, round(size.height() * dpr)))
+            pixmap.setDevicePixelRatio(dpr)
+            pixmap.fill(Qt.transparent)
+            card_painter = QPainter(pixmap)
+            card_painter.setRenderHint(QPainter.Antialiasing)
+            self._draw_card(card_painter, card, QtCore.QRect(QtCore.QPoint(0, 0), size), dpr, hovered)
+            card_painter.end()
+            card.pixmap = pixmap
+            card.pixmap_key = key
+            self.cards_rendered += 1
+            instrumentation.end(token)
+        painter.drawPixmap(card.rect.topLeft(), card.pixmap)
+
+    def _draw_card(self, painter, card, rect, dpr, hovered):
+        """Draw a card into rect."""
+        color = NOTIFICATION_COLORS.get(card.notification_type, NOTIFICATION_COLORS[NotificationType.INFO])
+        text_color = self.styles.color(card.notification_type)
+        icon_path = NOTIFICATION_ICONS.get(card.notification_type, 'info.svg')
+
+        # Draw the pre-rendered background
+        painter.drawPixmap(rect.topLeft(), background_cache.get(rect.size(), dpr, self.styles.background))
+        if card.progress is not None and not card.is_more_notifications:
+            _paint_progress(painter, rect, card.progress, text_color)
+
+        # Draw the type icon, using a placeholder if the icon is not found
+        icon_rect = QtCore.QRect(rect.x() + 15, rect.center().y() - 10, 20, 20)
+        painter.setPen(text_color)
+        if card.show_icon:
+            icon = icon_cache.get_pixmap(icon_path, color, 20, dpr)
+            if icon.isNull():
+                painter.setFont(self.card_font)
+                painter.drawText(icon_rect, Qt.AlignCenter, '❓')
+            else:
+                painter.drawPixmap(icon_rect, icon)
+
+        # Draw the close button, red while hovered
+        close_rect = _close_rect(rect)
+        close_icon = icon_cache.get_pixmap('cross_icon.svg', '#ff0000' if hovered else color, 16, dpr)
+        if close_icon.isNull():
+            painter.setFont(self.card_font)
+            painter.drawText(close_rect, Qt.AlignCenter, '✕')
+        else:
+            painter.drawPixmap(close_rect, close_icon)
+
+        # Draw the repeat counter to the left of the close button
+        text_right = close_rect.left() - 10
+        repeat_text = card.repeat_text()
+        if repeat_text:
+            repeat_width = text_measure_cache.measure(repeat_text, self.repeat_font, rect.width())[1].width()
+            text_right -= repeat_width
+            painter.setPen(Qt.white)
+            painter.setFont(self.repeat_font)
+            painter.drawText(QtCore.QRect(text_right, rect.y(), repeat_width, rect.height()),
+                             Qt.AlignCenter, repeat_text)
+            text_right -= 10
+
+        # Draw the elided message
+        text_left = icon_rect.right() + 1 + 10
+        painter.setPen(text_color)
+        painter.setFont(self.card_font)
+        painter.drawText(QtCore.QRect(text_left, rect.y(), text_right - text_left, rect.height()),
+                         Qt.AlignLeft | Qt.AlignVCenter, card.elided_text)
+
+    def mouseMoveEvent(self, event):
+        card = self.card_at(event.pos())
+        over_close = card is not None and card.close_rect().contains(event.pos())
+        if card is not self._hover_card or over_close != self._hover_close:
+            previous = self._hover_card
+            self._hover_card = card
+            self._hover_close = over_close
+            # Keep the hovered card up while the pointer is over it
+            if previous is not card:
+                if previous is not None:
+                    previous.resume_auto_hide()
+                if card is not None:
+                    card.pause_auto_hide()
+            if previous is not None:
+                self.update(previous.rect)
+            if card is not None:
+                self.update(card.rect)
+            if over_close:
+                self.setCursor(Qt.PointingHandCursor)
+            else:
+                self.unsetCursor()
+        super().mouseMoveEvent(event)
+
+    def leaveEvent(self, event):
+        if self._hover_card is not None:
+            self._hover_card.resume_auto_hide()
+            self.update(self._hover_card.rect)
+        self._hover_card = None
+        self._hover_close = False
+        self.unsetCursor()
+        super().leaveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            card = self.card_at(event.pos())
+            if card is not None and card.close_rect().contains(event.pos()):
+                card.close_notification()
+                return
+        super().mouseReleaseEvent(event)
+
+    def event(self, event):
+        if event.type() == QtCore.QEvent.ToolTip:
+            card = self.card_at(event.pos())
+            if card is not None and not card.close_rect().contains(event.pos()):
+                QtWidgets.QToolTip.showText(event.globalPos(), card.tooltip(), self, card.rect)
+            else:
+                QtWidgets.QToolTip.hideText()
+                event.ignore()
+            return True
+        return super().event(event)
+
+class NotificationBackend:
+    """Presentation side of a NotificationManager.
+
+    The manager decides what is shown, queued, coalesced and dropped; its
+    backend creates the objects that display it. Those must offer the part of
+    the Notifier interface the manager uses, as HeadlessNotification does.
+    """
+    name = None
+    uses_widgets = True  # Creates QWidgets, so it needs a QApplication
+    needs_layout = True  # Notifications are positioned over the parent window
+    uses_notifier_pool = True  # Notifications are Notifier widgets, so warming up the pool pays off
+    manager = None
+
+    def attach(self, manager):
+        """Bind the backend to the one manager it serves."""
+        if self.manager is not None and self.manager is not manager:
+            raise ValueError(f"{type(self).__name__} is already attached to another NotificationManager; "
+                             "pass a backend class or factory to create one per manager")
+        self.manager = manager
+
+    def create(self, record, close_callback):
+        """Return a not yet shown notification object for a PendingNotification."""
+        raise NotImplementedError
+
+    def notification_changed(self, notification, event):
+        """Called by HeadlessNotification objects with 'show', 'hide', 'update' or 'close'."""
+
+    def stats(self):
+        return {'name': self.name}
+
+class WidgetBackend(NotificationBackend):
+    """Each notification is a top-level Notifier widget, recycled through the manager's pool."""
+    name = 'widgets'
+
+    def create(self, record, close_callback):
+        return self.manager.pool.acquire(
+            record.message,
+            notification_type=record.notification_type,
+            auto_hide=record.auto_hide,
+            close_callback=close_callback,
+            parent=self.manager.parent,
+            show_icon=self.manager.show_icons
+        )
+
+class OverlayBackend(WidgetBackend):
+    """Every notification of the parent window is painted by one NotificationOverlay.
+
+    Falls back to Notifier widgets while the manager has no parent window.
+    """
+    name = 'overlay'
+    uses_notifier_pool = False  # Only for that fallback, which is not worth pre-building windows for
+
+    def create(self, record, close_callback):
+        manager = self.manager
+        if manager.parent is None:
+            return super().create(record, close_callback)
+        if manager.overlay is None:
+            manager.overlay = NotificationOverlay(manager.parent, manager.cache_cards)
+        return manager.overlay.create_card(
+            record.message,
+            notification_type=record.notification_type,
+            auto_hide=record.auto_hide,
+            close_callback=close_callback
+        )
+
+class HeadlessBackend(NotificationBackend):
+    """Keeps the shown notifications in memory only and constructs no QWidget.
+
+    For CI, batch jobs and servers without a display. log, if given, is called
+    with a line of text whenever a notification is shown, updated or closed,
+    for example print or logging.getLogger(__name__).info.
+    """
+    name = 'headless'
+    uses_widgets = False
+    needs_layout = False
+    uses_notifier_pool = False
+
+    def __init__(self, log=None):
+        self.log = log
+
+    def create(self, record, close_callback):
+        return HeadlessNotification(record.message, record.notification_type, record.auto_hide, close_callback,
+                                    backend=self)
+
+    def notification_changed(self, notification, event):
+        """Log a visible change; return whether the change was reported."""
+        # Changes made while hidden, such as a queued notification's first message, are not reported
+        if event == 'hide' or (event == 'update' and notification.isHidden()):
+            return False
+        if self.log is not None:
+            self.log(f"{event}: [{notification.notification_type}] {notification.display_text}")
+        return True
+
+class RecordingBackend(HeadlessBackend):
+    """Headless backend that records every display event, for tests.
+
+    events holds (event, text, type, repeat count, progress) tuples in order.
+    """
+    name = 'recording'
+
+    def __init__(self, log=None):
+        super().__init__(log)
+        self.events = []
+
+    def notification_changed(self, notification, event):
+        if not super().notification_changed(notification, event):
+            return False
+        self.events.append((event, notification.display_text, notification.notification_type,
+                            notification.repeat_count, notification.progress))
+        return True
+
+    def messages(self, event='show'):
+        """Texts of the recorded events of one kind, in order."""
+        return [entry[1] for entry in self.events if entry[0] == event]
+
+    def visible(self):
+        """Texts of the notifications currently shown, top first."""
+        return [notification.display_text for notification in self.manager.active_notifications]
+
+    def clear(self):
+        self.events.clear()
+
+    def stats(self):
+        return {'name': self.name, 'events': len(self.events)}
+
+# Backends selectable by name through NotificationManager(render_mode=...)
+DISPLAY_BACKENDS = {
+    'widgets': WidgetBackend,
+    'overlay': OverlayBackend,
+    'headless': HeadlessBackend,
+    'recording': RecordingBackend,
+}
+
+class HistoryRecord:
+    """A compact entry of the notification history."""
+    __slots__ = ('timestamp', 'notification_type', 'message', 'repeat_count', 'reason')
+
+    def __init__(self, timestamp, notification_type, message, repeat_count=1, reason='closed'):
+        self.timestamp = timestamp
+        self.notification_type = notification_type
+        self.message = message
+        self.repeat_count = repeat_count
+        self.reason = reason  # 'closed', 'cleared' by the "more" summary, or 'dropped'
+
+    def matches(self, notification_type=None, since=None, until=None, text=None):
+        if notification_type is not None and self.notification_type != notification_type:
+            return False
+        if since is not None and self.timestamp < since:
+            return False
+        if until is not None and self.timestamp >= until:
+            return False
+        return text is None or text.lower() in self.message.lower()
+
+class NotificationHistory:
+    """Ring buffer of past notifications with an optional append-only sqlite log.
+
+    Entries are addressed by a stable absolute index (0 for the first entry ever
+    logged). The ring buffer keeps the latest capacity entries in memory; with a
+    log_path every entry is also written to sqlite, indexed by type and time, and
+    older entries are read back from there. Messages are also indexed for text
+    search in an FTS5 trigram table over their lowercased text, so search() on
+    the log matches substrings exactly like the in-memory path does.
+    """
+    PAGE_SIZE = 256
+
+    def __init__(self, capacity=10000, log_path=None):
+        self._ring = deque(maxlen=capacity)
+        self._connection = None
+        self._pending = []  # Records not yet written to the log
+        self._pages = OrderedDict()  # page number -> list of records read from the log
+        self._text_index = False  # True once the log has its FTS5 message index
+        self.appended = 0  # Absolute index one past the newest entry
+
+        if log_path is not None:
+            self._connection = sqlite3.connect(log_path)
+            self._connection.executescript("""
+                CREATE TABLE IF NOT EXISTS history (
+                    id INTEGER PRIMARY KEY,
+                    timestamp REAL NOT NULL,
+                    type TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    repeat_count INTEGER NOT NULL,
+                    reason TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS history_timestamp ON history (timestamp);
+                CREATE INDEX IF NOT EXISTS history_type_timestamp ON history (type, timestamp);
+            """)
+            self.appended = self._connection.execute("SELECT COALESCE(MAX(id), 0) FROM history").fetchone()[0]
+            # Same case folding as HistoryRecord.matches, for short needles and to confirm index hits
+            self._connection.create_function(
+                'notification_contains', 2, lambda message, text: text in message.lower(), deterministic=True)
+            self._text_index = self._create_text_index()
+
+    def _create_text_index(self):
+        """Create the FTS5 table searched by search(text=...); False if this sqlite lacks FTS5 trigrams."""
+        connection = self._connection
+        try:
+            # Contentless: only the index is stored; rowid is the history id
+            connection.execute("CREATE VIRTUAL TABLE IF NOT EXISTS history_text "
+                               "USING fts5(folded, content='', tokenize='trigram case_sensitive 1')")
+        except sqlite3.OperationalError:
+            return False
+        # user_version 1 marks a log whose existing rows have been indexed
+        if connection.execute("PRAGMA user_version").fetchone()[0] < 1:
+            connection.executemany(
+                "INSERT INTO history_text (rowid, folded) VALUES (?, ?)",
+                ((row_id, message.lower()) for row_id, message in
+                 connection.execute("SELECT id, message FROM history").fetchall())
+            )
+            connection.execute("PRAGMA user_version = 1")
+            connection.commit()
+        return True
+
+    def record(self, message, notification_type=NotificationType.INFO, repeat_count=1, reason='closed',
+               timestamp=None):
+        """Append an entry to the history."""
+        entry = HistoryRecord(time.time() if timestamp is None else timestamp, notification_type, message,
+                              repeat_count, reason)
+        self._ring.append(entry)
+        self.appended += 1
+        if self._connection is not None:
+            self._pending.append(entry)
+            if len(self._pending) >= self.PAGE_SIZE:
+                self.flush()
+        return entry
+
+    def record_notifier(self, notifier, reason='closed'):
+        """Append a closed Notifier or OverlayCard to the history."""
+        return self.record(notifier.original_message, notifier.original_type, notifier.repeat_count, reason,
+                           getattr(notifier, 'created_at', None))
+
+    def record_pending(self, record, reason):
+        """Append a PendingNotification that never made it on screen to the history."""
+        return self.record(record.message, record.notification_type, record.repeat_count, reason, record.created)
+
+    def flush(self):
+        """Write buffered entries to the log."""
+        if self._connection is None or not self._pending:
+            return
+        # Ids follow the absolute index, so the text index can share them
+        first_id = self.appended - len(self._pending) + 1
+        self._connection.executemany(
+            "INSERT INTO history (id, timestamp, type, message, repeat_count, reason) VALUES (?, ?, ?, ?, ?, ?)",
+            [(first_id + i, r.timestamp, r.notification_type, r.message, r.repeat_count, r.reason)
+             for i, r in enumerate(self._pending)]
+        )
+        if self._text_index:
+            self._connection.executemany(
+                "INSERT INTO history_text (rowid, folded) VALUES (?, ?)",
+                [(first_id + i, r.message.lower()) for i, r in enumerate(self._pending)]
+            )
+        self._connection.commit()
+        self._pending.clear()
+
+    def close(self):
+        """Flush and close the log."""
+        if self._connection is not None:
+            self.flush()
+            self._connection.close()
+            self._connection = None
+
+    @property
+    def first_index(self):
+        """Absolute index of the oldest entry that can still be read."""
+        if self._connection is not None:
+            return 0
+        return self.appended - len(self._ring)
+
+    def __len__(self):
+        return self.appended - self.first_index
+
+    def entry(self, index):
+        """Return the entry at an absolute index."""
+        ring_start = self.appended - len(self._ring)
+        if index >= ring_start:
+            return self._ring[index - ring_start]
+        if self._connection is None or index < 0:
+            raise IndexError(index)
+        page_number = index // self.PAGE_SIZE
+        page = self._pages.get(page_number)
+        if page is None:
+            self.flush()
+            start = page_number * self.PAGE_SIZE
+            rows = self._connection.execute(
+                "SELECT timestamp, type, message, repeat_count, reason FROM history "
+                "WHERE id > ? AND id <= ? ORDER BY id",
+                (start, start + self.PAGE_SIZE)
+            ).fetchall()
+            page = [HistoryRecord(*row) for row in rows]
+            if len(page) == self.PAGE_SIZE:  # The last page may still grow
+                self._pages[page_number] = page
+                while len(self._pages) > 64:
+                    self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page_number)
+        return page[index - page_number * self.PAGE_SIZE]
+
+    def search(self, notification_type=None, since=None, until=None, text=None, limit=None):
+        """Return entries matching every given filter, oldest first.
+
+        since and until are time.time() timestamps; text is a case-insensitive substring.
+        """
+        if self._connection is None:
+            matches = (entry for entry in self._ring if entry.matches(notification_type, since, until, text))
+            return list(itertools.islice(matches, limit))
+
+        self.flush()
+        clauses, params = [], []
+        if notification_type is not None:
+            clauses.append("type = ?")
+            params.append(notification_type)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        if text is not None:
+            folded = text.lower()
+            if self._text_index and len(folded) >= 3:
+                # Trigrams only index needles of three or more characters
+                clauses.append("id IN (SELECT rowid FROM history_text WHERE history_text MATCH ?)")
+                params.append('"' + folded.replace('"', '""') + '"')
+            clauses.append("notification_contains(message, ?)")
+            params.append(folded)
+        query = "SELECT timestamp, type, message, repeat_count, reason FROM history"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [HistoryRecord(*row) for row in self._connection.execute(query, params)]
+
+class NotificationHistoryModel(QtCore.QAbstractListModel):
+    """List model over a NotificationHistory that only materializes the rows a view asks for.
+
+    New and evicted entries are picked up by a periodic sync, so bursts of
+    notifications cost one row insertion per sync rather than one per entry.
+    """
+    def __init__(self, history, parent=None, sync_interval=200):
+        super().__init__(parent)
+        self.history = history
+        self.styles = notification_styles()
+        self._first = history.first_index
+        self._end = history.appended
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.sync)
+        self._timer.start(sync_interval)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._end - self._first
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self.history.entry(self._first + index.row())
+        if role == Qt.DisplayRole:
+            text = f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry.timestamp))}  {entry.message}"
+            if entry.repeat_count > 1:
+                text += f"  ×{entry.repeat_count}"
+            return text
+        if role == Qt.ForegroundRole:
+            return self.styles.color(entry.notification_type)
+        if role == Qt.ToolTipRole:
+            return f"{entry.notification_type} ({entry.reason}): {entry.message}"
+        return None
+
+    def sync(self):
+        """Pick up entries appended to, or evicted from, the history since the last sync."""
+        first, end = self.history.first_index, self.history.appended
+        if first >= self._end:
+            # Everything shown so far has been evicted
+            self.beginResetModel()
+            self._first, self._end = first, end
+            self.endResetModel()
+            return
+        if first > self._first:
+            self.beginRemoveRows(QtCore.QModelIndex(), 0, first - self._first - 1)
+            self._first = first
+            self.endRemoveRows()
+        if end > self._end:
+            rows = self._end - self._first
+            self.beginInsertRows(QtCore.QModelIndex(), rows, rows + end - self._end - 1)
+            self._end = end
+            self.endInsertRows()
+
+class NotificationHistoryView(QtWidgets.QListView):
+    """Virtualized list of past notifications; only the visible rows are ever rendered."""
+    def __init__(self, history, parent=None):
+        super().__init__(parent)
+        self.setUniformItemSizes(True)  # Lets the view skip measuring rows it does not paint
+        self.setModel(NotificationHistoryModel(history, self))
+        self.setObjectName("notificationHistory")
+        notification_styles()
+        self._at_bottom = True
+        self.model().rowsAboutToBeInserted.connect(self._check_tail)
+        self.model().rowsInserted.connect(self._follow_tail)
+
+    def _check_tail(self):
+        scroll_bar = self.verticalScrollBar()
+        self._at_bottom = scroll_bar.value() == scroll_bar.maximum()
+
+    def _follow_tail(self):
+        # Keep scrolled to the newest entry unless the user scrolled away
+        if self._at_bottom:
+            self.scrollToBottom()
+
+class _Batch:
+    """Context manager returned by NotificationManager.batch()."""
+    __slots__ = ('manager', 'outer')
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    def __enter__(self):
+        self.outer = self.manager._batching
+        self.manager._batching = True
+        return self.manager
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if not self.outer:
+            self.manager._batching = False
+            self.manager._flush_batch()
+        return False
+
+class NotificationManager(QtCore.QObject):
+    _instance = None  # Default instance, used when no window is given or active
+    _instances = {}  # parent widget -> its NotificationManager, for get_instance()
+    default_render_mode = 'widgets'  # Name or backend class of the managers get_instance() creates
+
+    # Emitted from any thread when the submission inbox goes from empty to non-empty
+    _inbox_ready = QtCore.pyqtSignal()
+    degradation_changed = QtCore.pyqtSignal(int)  # New DEGRADATION_LEVELS index
+
+    def __init__(self, parent=None, max_notifications=3, auto_hide=True, pool_size=8, warm_up=False,
+                 dedup_window=2.0, rate_limit=None, rate_burst=None, max_backlog=None,
+                 drop_policy='drop-oldest', render_mode='widgets', history=None, prewarm=False,
+                 auto_hide_duration=AUTO_HIDE_DURATION, spill_threshold=None, spill_dir=None, max_update_rate=60,
+                 cache_cards=False, pool=None, adaptive=False, lag_thresholds=LAG_THRESHOLDS, recovery_time=2.0,
+                 degraded_max_notifications=1):
+        if max_update_rate <= 0:
+            raise ValueError(f"max_update_rate must be positive, got {max_update_rate!r}")
+        parent = _application_window(parent)
         super().__init__(parent)
         # Use QApplication's active window if parent is None
         if parent is None:
-            parent = QApplication.activeWindow()
+            parent = _application_window(QApplication.activeWindow())
         self.parent = parent
         self.max_notifications = max_notifications
         self.auto_hide = auto_hide
-        self.active_notifications = []
-        self.notification_queue = []
-
-        # Create the notification icon widget
-        self.notification_icon = NotificationIcon(self.parent, self)
-        self.notification_icon.hide()
+        self.auto_hide_duration = auto_hide_duration  # Default seconds before an auto-hiding notification closes
+        self.active_notifications = ActiveNotifications()
+        # Past spill_threshold queued records in memory, the tail of the backlog is
+        # paged out to temporary files in spill_dir (the system default when None)
+        # Keyed and grouped records stay in memory, where later updates and repeats can find them
+        self.notification_queue = NotificationQueue(spill_threshold, spill_dir, on_spill=self._forget_spilled,
+                                                    pinned=_coalesces_indefinitely)
+
+        # render_mode is a DISPLAY_BACKENDS name, a NotificationBackend class or factory,
+        # or an unattached NotificationBackend: 'widgets' gives each notification its
+        # own top-level Notifier window, 'overlay' paints every card of the parent
+        # window in one NotificationOverlay, and 'headless' and 'recording' keep them
+        # in memory without creating any widget
+        if isinstance(render_mode, str):
+            if render_mode not in DISPLAY_BACKENDS:
+                raise ValueError(f"Unknown render mode: {render_mode}")
+            self.backend = DISPLAY_BACKENDS[render_mode]()
+        else:
+            self.backend = render_mode if isinstance(render_mode, NotificationBackend) else render_mode()
+            render_mode = self.backend.name
+        self.render_mode = render_mode
+        self.backend.attach(self)
+        self.overlay = None
+        self.cache_cards = cache_cards  # Overlay mode: blit each card from a pixmap rendered once per change
+
+        # Optional NotificationHistory that keeps closed, cleared and dropped notifications
+        self.history = history
+
+        # Repeats are folded into the live or queued notification with the same key.
+        # Maps coalescing key -> [Notifier or PendingNotification, last seen time].
+        self.dedup_window = dedup_window  # Seconds; None or 0 disables message deduplication
+        self._coalesce_index = {}
+        self.coalesced_count = 0
+
+        # Optional admission control: a token bucket on new notifications and a cap
+        # on the pending backlog. drop_policy is a DROP_POLICIES name or a callable.
+        self.rate_limiter = TokenBucket(rate_limit, rate_burst) if rate_limit else None
+        self.max_backlog = max_backlog
+        self.drop_policy = DROP_POLICIES[drop_policy] if isinstance(drop_policy, str) else drop_policy
+        self.dropped_count = 0
+        self.rate_limited_count = 0
+        self._unreported_drops = 0  # Drops not yet cleared by dismissing the "more" summary
+
+        # One scheduler runs the auto-hide countdowns of every notification on a single timer
+        self.expiry = ExpiryScheduler(self)
+
+        # Closed notifiers are recycled through the pool instead of deleted; pass a
+        # shared pool (see shared_notifier_pool()) to recycle them across windows
+        self.pool = pool if pool is not None else NotifierPool(self.parent, max_size=pool_size)
+        if warm_up and self.backend.uses_notifier_pool:
+            self.pool.warm_up()
+
+        # Thread-safe submission inbox, drained in batches on the GUI thread
+        self._inbox = deque()
+        self._inbox_lock = threading.Lock()
+        self._inbox_scheduled = False
+        self._inbox_ready.connect(self._drain_inbox, Qt.QueuedConnection)
+        self._batching = False
+        self._layout_dirty = False
+        self._top_dirty = False
+        self.batches_drained = 0
+        self.largest_batch = 0
+
+        # Keyed updates: the latest update per key from other threads, and the visible
+        # notifications waiting for the next throttled repaint (target -> (key, progress))
+        self._updates = {}
+        self._dirty_updates = {}
+        self.updates_received = 0
+        self.updates_applied = 0
+        self._update_timer = QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(max(1, int(1000 / max_update_rate)))
+        self._update_timer.timeout.connect(self._flush_updates)
+
+        # Window events only mark the layout dirty; one pass runs per frame
+        self._layout_timer = QTimer(self)
+        self._layout_timer.setSingleShot(True)
+        self._layout_timer.setInterval(16)
+        self._layout_timer.timeout.connect(self._position_notifications)
+
+        # The count badge is only built once the window first gets too small for the stack
+        self.notification_icon = None
+
+        # Adaptive degradation: with adaptive, the event-loop lag measured by the shared
+        # LagMonitor moves the manager through DEGRADATION_LEVELS one step at a time.
+        # A level is left once the lag stayed below half its threshold for recovery_time.
+        self.lag_thresholds = tuple(lag_thresholds)
+        self.recovery_time = recovery_time
+        self.degraded_max_notifications = degraded_max_notifications
+        self.degradation_level = 0
+        self.degradation_changes = 0
+        self.show_icons = True
+        self._full_max_notifications = max_notifications
+        self._update_interval = self._update_timer.interval()
+        self._layout_interval = self._layout_timer.interval()
+        self._calm_since = None
+        self.lag_monitor = None
+        self._lag_token = None
+        if adaptive:
+            self.set_adaptive(True)
+
+        if prewarm and self.backend.uses_widgets:
+            prewarm_icons()
 
         # Track the main window's state
         if self.parent is not None:
@@ -372,114 +2788,605 @@ class NotificationManager(QtCore.QObject):
 
     @classmethod
     def get_instance(cls, parent=None):
+        """Return the manager of parent, creating it on first use.
+
+        Each window gets its own manager, stack and layout; all of them share
+        the process-wide notifier pool and icon, text and background caches.
+        Without a parent the active window is used, and failing that the
+        default instance. A toast or count badge stands for the window it
+        belongs to, so no manager is ever keyed on one of them.
+        """
+        if parent is None:
+            parent = QApplication.activeWindow()
+        parent = _application_window(parent)
+        if parent is None:
+            if cls._instance is None:
+                cls._instance = cls(None, render_mode=cls._default_backend(), pool=shared_notifier_pool())
+            return cls._instance
+        instance = cls._instances.get(parent)
+        if instance is not None:
+            return instance
+        if cls._instance is not None and cls._instance.parent is None:
+            # Adopt the default instance created before any window existed
+            instance = cls._instance
+            instance.parent = parent
+            if instance.notification_icon is not None:
+                instance.notification_icon.setParent(parent)
+                instance.notification_icon.parent = parent
+                instance.notification_icon.adjust_position()
+            parent.installEventFilter(instance)
+        else:
+            instance = cls(parent, render_mode=cls._default_backend(), pool=shared_notifier_pool())
+        cls._instances[parent] = instance
         if cls._instance is None:
-            cls._instance = cls(parent)
-        elif parent is not None and cls._instance.parent is None:
-            # Update the parent if it was previously None
-            cls._instance.parent = parent
-            cls._instance.notification_icon.setParent(parent)
-            cls._instance.notification_icon.parent = parent
-            cls._instance.notification_icon.adjust_position()
-            if cls._instance.parent is not None:
-                cls._instance.parent.installEventFilter(cls._instance)
-        return cls._instance
+            cls._instance = instance
+        parent.destroyed.connect(instance._parent_destroyed)
+        return instance
+
+    def serve(self, name, rate=100, burst=None, max_pending=10000):
+        """Run this manager as a notification daemon listening on the local socket name.
+
+        Returns the listening NotificationDaemon; see notification_client.py for the client side.
+        """
+        daemon = NotificationDaemon(name, self, rate, burst, max_pending, parent=self)
+        daemon.listen()
+        return daemon
 
     @classmethod
-    def show_notification(cls, message, notification_type=NotificationType.INFO, auto_hide=True, parent=None):
-        """Class method to show a notification using the singleton instance."""
+    def _default_backend(cls):
+        """default_render_mode, or 'headless' when there is no QApplication to create widgets with."""
+        render_mode = cls.default_render_mode
+        backend_class = DISPLAY_BACKENDS.get(render_mode) if isinstance(render_mode, str) else render_mode
+        if getattr(backend_class, 'uses_widgets', False):
+            if not isinstance(QtCore.QCoreApplication.instance(), QApplication):
+                return 'headless'
+        return render_mode
+
+    def _parent_destroyed(self):
+        """Forget a per-window manager whose window is being deleted."""
+        cls = type(self)
+        for parent, instance in list(cls._instances.items()):
+            if instance is self:
+                del cls._instances[parent]
+        if cls._instance is self:
+            cls._instance = None
+        self.expiry.cancel_all()
+        if self.lag_monitor is not None:
+            self.lag_monitor.measured.disconnect(self._lag_measured)
+            self.lag_monitor.release(self._lag_token)
+            self.lag_monitor = None
+
+    @classmethod
+    def show_notification(cls, message, notification_type=NotificationType.INFO, auto_hide=True, parent=None, priority=0,
+                          group=None, duration=None):
+        """Class method to show a notification on the manager of parent, or of the active window."""
         instance = cls.get_instance(parent)
-        instance.add_notification(message, notification_type, auto_hide)
+        instance.add_notification(message, notification_type, auto_hide, priority, group, duration)
+
+    @classmethod
+    def submit_notification(cls, message, notification_type=NotificationType.INFO, auto_hide=True, priority=0,
+                            group=None, duration=None, parent=None):
+        """Thread-safe class method to queue a notification on the manager of parent, or the default instance."""
+        instance = cls._instance if parent is None else cls._instances.get(parent)
+        if instance is None:
+            raise RuntimeError("NotificationManager.get_instance() must be called on the GUI thread first")
+        instance.submit(message, notification_type, auto_hide, priority, group, duration)
+
+    def submit(self, message, notification_type=NotificationType.INFO, auto_hide=True, priority=0, group=None,
+               duration=None):
+        """Queue a notification from any thread without blocking.
+
+        Submissions are collected in an inbox and shown by the GUI thread in
+        one batch per event-loop turn, with a single layout pass per batch.
+        """
+        # deque.append is atomic, so producers only take the lock to wake the GUI thread
+        instrumentation.count('manager.submitted')
+        self._inbox.append((message, notification_type, auto_hide, priority, group, duration))
+        if not self._inbox_scheduled:
+            with self._inbox_lock:
+                if self._inbox_scheduled:
+                    return
+                self._inbox_scheduled = True
+            self._inbox_ready.emit()
+
+    def submit_update(self, key, message, notification_type=NotificationType.INFO, progress=None, auto_hide=True,
+                      priority=0, duration=None):
+        """Thread-safe update_notification.
+
+        Only the latest update for each key is kept until the GUI thread drains
+        the inbox, so a job may report progress as often as it likes.
+        """
+        with self._inbox_lock:
+            self._updates[key] = (message, notification_type, progress, auto_hide, priority, duration)
+            if self._inbox_scheduled:
+                return
+            self._inbox_scheduled = True
+        self._inbox_ready.emit()
+
+    def _drain_inbox(self):
+        """Show every submission waiting in the inbox as a single batch."""
+        with self._inbox_lock:
+            # Reset before draining so a producer racing with us schedules another turn
+            self._inbox_scheduled = False
+            updates = self._updates
+            if updates:
+                self._updates = {}
+        count = len(self._inbox)
+        if not count and not updates:
+            return
+        token = instrumentation.begin('manager.drain_batch')
+        instrumentation.gauge('inbox.batch_size', count + len(updates))
+        try:
+            with self.batch():
+                popleft = self._inbox.popleft
+                for _ in range(count):
+                    submission = popleft()
+                    # One bad submission must not strand the rest of the batch
+                    try:
+                        self.add_notification(*submission)
+                    except Exception as e:
+                        print(f"Dropping submitted notification {submission[0]!r}: {e}")
+                for key, update in updates.items():
+                    try:
+                        self.update_notification(key, *update)
+                    except Exception as e:
+                        print(f"Dropping update for notification key {key!r}: {e}")
+        finally:
+            self.batches_drained += 1
+            self.largest_batch = max(self.largest_batch, count + len(updates))
+            instrumentation.end(token)
+
+    def batch(self):
+        """Return a context manager under which added notifications are laid out in one pass.
+
+        The stack, the "more" summary and the badge are updated once when the
+        outermost batch exits; batches may be nested.
+        """
+        return _Batch(self)
+
+    def _flush_batch(self):
+        """Run the layout work deferred while a batch was being added."""
+        if self._top_dirty:
+            self._top_dirty = False
+            self._update_top_notification()
+        if self._layout_dirty:
+            self._layout_dirty = False
+            self._position_notifications()
+        self._update_icon_count()
 
     def eventFilter(self, obj, event):
         if obj == self.parent:
             if event.type() == QtCore.QEvent.WindowStateChange:
-                self._position_notifications()
+                self._schedule_layout()
             elif event.type() == QtCore.QEvent.ActivationChange:
-                self._position_notifications()
+                self._schedule_layout()
             elif event.type() == QtCore.QEvent.Resize:
-                self._position_notifications()
+                self._schedule_layout()
         return False
 
-    def add_notification(self, message, notification_type=NotificationType.INFO, auto_hide=True):
-        """Add a new notification and handle the queue."""
-        if len(self.active_notifications) < self.max_notifications:
-            self._show_notification(message, notification_type, auto_hide)
+    def _schedule_layout(self):
+        """Coalesce layout requests into a single pass on the next frame."""
+        if not self._layout_timer.isActive():
+            self._layout_timer.start()
+
+    def add_notification(self, message, notification_type=NotificationType.INFO, auto_hide=True, priority=0,
+                         group=None, duration=None):
+        """Add a new notification and handle the queue.
+
+        When the stack is full the notification is queued; queued notifications
+        are shown by severity, then by priority (higher first), then in arrival order.
+        A message identical to one shown or queued within dedup_window seconds, or
+        one sharing its group key, is folded into it as a repeat instead, which
+        also extends its auto-hide countdown. duration overrides auto_hide_duration.
+        """
+        if group is not None:
+            key = ('group', group)
+        else:
+            key = ('message', message, notification_type)
+        if self._coalesce(key, message, notification_type, group is not None):
+            return
+        if self._rate_limited(message, notification_type):
+            return
+        self._admit(PendingNotification(message, notification_type, auto_hide, priority, key, duration))
+
+    def update_notification(self, key, message, notification_type=NotificationType.INFO, progress=None, auto_hide=True,
+                            priority=0, duration=None):
+        """Show a notification identified by key, or update the one already shown or queued for it.
+
+        Use this for progress streams: the text, type and progress (a fraction
+        from 0 to 1, or None for no bar) change in place. Visible notifications
+        are repainted at most max_update_rate times per second and only with
+        the latest update; each update also extends the auto-hide countdown.
+        """
+        self.updates_received += 1
+        index_key = ('key', key)
+        entry = self._coalesce_index.get(index_key)
+        if entry is not None:
+            target = entry[0]
+            if isinstance(target, PendingNotification):
+                if target.queued:
+                    self._update_pending(target, message, notification_type, progress)
+                    return
+            elif target in self.active_notifications and target.coalesce_key == index_key:
+                target.original_message = message
+                target.original_type = notification_type
+                self._dirty_updates[target] = (index_key, progress)
+                if not self._update_timer.isActive():
+                    self._update_timer.start()
+                return
+            del self._coalesce_index[index_key]
+        if self._rate_limited(message, notification_type):
+            return
+        record = PendingNotification(message, notification_type, auto_hide, priority, index_key, duration)
+        record.progress = progress
+        self._admit(record)
+
+    def _update_pending(self, record, message, notification_type, progress):
+        """Update a queued keyed record; a new type re-queues it at its new severity."""
+        self.updates_applied += 1
+        record.progress = progress
+        if notification_type != record.notification_type:
+            self._replace_pending(record, message, notification_type)
+        else:
+            self.notification_queue.set_message(record, message)
+
+    def _replace_pending(self, record, message, notification_type):
+        """Re-queue a coalescing record at the severity of its new type."""
+        # Removal is lazy, so the record is replaced rather than pushed again
+        self.notification_queue.remove(record)
+        replacement = PendingNotification(message, notification_type, record.auto_hide, record.priority,
+                                          record.key, record.duration)
+        replacement.repeat_count = record.repeat_count
+        replacement.created = record.created
+        replacement.progress = record.progress
+        self.notification_queue.push(replacement)
+        self._coalesce_index[record.key][0] = replacement
+
+    def _flush_updates(self):
+        """Apply the latest update of every visible keyed notification changed since the last flush."""
+        updates, self._dirty_updates = self._dirty_updates, {}
+        token = instrumentation.begin('manager.updates')
+        for target, (index_key, progress) in updates.items():
+            # The target may have closed, or been recycled for another notification
+            if target not in self.active_notifications or target.coalesce_key != index_key:
+                continue
+            self.updates_applied += 1
+            if not target.is_more_notifications:
+                target.set_message(target.original_message, target.original_type)
+            target.set_progress(progress)
+            target.refresh_auto_hide()
+        self._position_notifications()
+        instrumentation.end(token)
+
+    def _rate_limited(self, message, notification_type):
+        """Consume a token for a new notification; count and record it as dropped if there is none."""
+        if self.rate_limiter is None or self.rate_limiter.consume():
+            return False
+        if self.history is not None:
+            self.history.record(message, notification_type, reason='dropped')
+        self.rate_limited_count += 1
+        self._record_drops(1)
+        return True
+
+    def _record_drops(self, count):
+        """Count dropped notifications and surface them in the "more" summary while a backlog remains."""
+        self.dropped_count += count
+        self._unreported_drops += count
+        instrumentation.count('manager.dropped', count)
+        if self._batching:
+            self._top_dirty = True
         else:
-            self.notification_queue.append((message, notification_type, auto_hide))
             self._update_top_notification()
-        self.notification_icon.update_count()
 
-    def _show_notification(self, message, notification_type, auto_hide):
+    def _coalesce(self, key, message, notification_type, grouped):
+        """Fold a repeat into the live or queued notification with the same key."""
+        entry = self._coalesce_index.get(key)
+        if entry is None:
+            return False
+        target, last_seen = entry
+        now = time.monotonic()
+        if isinstance(target, PendingNotification):
+            alive = target.queued
+        else:
+            alive = target in self.active_notifications
+        if not alive or (not grouped and (not self.dedup_window or now - last_seen > self.dedup_window)):
+            del self._coalesce_index[key]
+            return False
+        entry[1] = now
+        self.coalesced_count += 1
+        instrumentation.count('manager.coalesced')
+        if isinstance(target, PendingNotification):
+            target.repeat_count += 1
+            if notification_type != target.notification_type:
+                # Only groups can change type; the record moves to its new severity
+                self._replace_pending(target, message, notification_type)
+            else:
+                self.notification_queue.set_message(target, message)
+            return True
+        if grouped:
+            # A group shows its latest message
+            target.original_message = message
+            target.original_type = notification_type
+            if not target.is_more_notifications:
+                target.set_message(message, notification_type)
+        target.set_repeat_count(target.repeat_count + 1)
+        target.refresh_auto_hide()
+        return True
+
+    def _admit(self, record):
+        """Show a record if there is room in the stack, otherwise queue it."""
+        if len(self.active_notifications) < self.max_notifications:
+            self._show_notification(record)
+        else:
+            if self.max_backlog is not None and len(self.notification_queue) >= self.max_backlog:
+                victim = self.drop_policy(self.notification_queue, record)
+                if victim is not record:
+                    self.notification_queue.remove(victim)
+                    entry = self._coalesce_index.get(victim.key)
+                    if entry is not None and entry[0] is victim:
+                        del self._coalesce_index[victim.key]
+                if self.history is not None:
+                    self.history.record_pending(victim, 'dropped')
+                self._record_drops(victim.repeat_count)
+                if victim is record:
+                    return
+            self.notification_queue.push(record)
+            self._coalesce_index[record.key] = [record, time.monotonic()]
+            if self._batching:
+                self._top_dirty = True
+            else:
+                self._update_top_notification()
+        if not self._batching:
+            self._update_icon_count()
+        self._sample_gauges()
+
+    def _forget_spilled(self, records):
+        """Drop the coalescing entries of records the queue paged out to disk.
+
+        Only message repeats can be affected; keyed and grouped records are pinned in memory.
+        """
+        index = self._coalesce_index
+        for record in records:
+            entry = index.get(record.key)
+            if entry is not None and entry[0] is record:
+                del index[record.key]
+
+    def _update_icon_count(self):
+        if self.notification_icon is not None:
+            self.notification_icon.update_count()
+
+    def set_adaptive(self, enabled):
+        """Start or stop degrading with event-loop lag; stopping restores full service."""
+        if enabled == (self.lag_monitor is not None):
+            return
+        if enabled:
+            self.lag_monitor = lag_monitor()
+            self.lag_monitor.measured.connect(self._lag_measured)
+            # Released when the manager is destroyed too, so the heartbeat cannot outlive it
+            self._lag_token = self.lag_monitor.acquire(self)
+        else:
+            self.lag_monitor.measured.disconnect(self._lag_measured)
+            self.lag_monitor.release(self._lag_token)
+            self.lag_monitor = None
+            self._calm_since = None
+            self.set_degradation_level(0)
+
+    def _lag_measured(self, lag):
+        """Step the degradation level up or down after a heartbeat."""
+        level = self.degradation_level
+        if level < len(self.lag_thresholds) and lag >= self.lag_thresholds[level]:
+            self._calm_since = None
+            self.set_degradation_level(level + 1)
+        elif level > 0 and lag < self.lag_thresholds[level - 1] / 2:
+            now = time.monotonic()
+            if self._calm_since is None:
+                self._calm_since = now
+            elif now - self._calm_since >= self.recovery_time:
+                # Restart the calm period so each further step down waits recovery_time again
+                self._calm_since = now
+                self.set_degradation_level(level - 1)
+        else:
+            self._calm_since = None
+
+    def set_degradation_level(self, level):
+        """Apply a DEGRADATION_LEVELS index; adaptive managers call this as the lag changes.
+
+        Notifications already visible stay up when the stack is reduced, but
+        the top one summarizes the rest; queued ones fill the stack again on
+        recovery.
+        """
+        level = max(0, min(level, len(DEGRADATION_LEVELS) - 1))
+        previous = self.degradation_level
+        if level == previous:
+            return
+        self.degradation_level = level
+        self.degradation_changes += 1
+        instrumentation.gauge('manager.degradation_level', level)
+
+        factor = COARSE_BATCH_FACTOR if level >= DEGRADE_COARSE_BATCHING else 1
+        self._update_timer.setInterval(self._update_interval * factor)
+        self._layout_timer.setInterval(self._layout_interval * factor)
+
+        self.show_icons = level < DEGRADE_NO_ICONS
+        for notification in self.active_notifications:
+            notification.set_show_icon(self.show_icons)
+
+        if level >= DEGRADE_REDUCED_STACK:
+            self.max_notifications = min(self._full_max_notifications, self.degraded_max_notifications)
+        else:
+            self.max_notifications = self._full_max_notifications
+        while len(self.active_notifications) < self.max_notifications and self.notification_queue:
+            self._admit(self.notification_queue.pop())
+        self._update_top_notification()
+
+        if (level >= DEGRADE_BADGE) != (previous >= DEGRADE_BADGE):
+            self._position_notifications()
+        self._update_icon_count()
+        self.degradation_changed.emit(level)
+
+    def _collapsed(self):
+        """True while only the count badge is shown: the window is too small or the manager is in badge mode."""
+        if not self.parent or not self.backend.needs_layout:
+            return False
+        return (self.degradation_level >= DEGRADE_BADGE or self.parent.width() < MIN_WIDTH
+                or self.parent.height() < MIN_HEIGHT)
+
+    def _sample_gauges(self):
+        """Record queue depth and widget counts while instrumentation is enabled."""
+        if instrumentation.enabled:
+            instrumentation.gauge('queue.depth', len(self.notification_queue))
+            instrumentation.gauge('notifications.active', len(self.active_notifications))
+            instrumentation.gauge('notifier.live', Notifier.live_count)
+
+    def stats(self):
+        """Return a snapshot of the manager's queues, caches, counters and instrumentation."""
+        return {
+            'active': len(self.active_notifications),
+            'queued': len(self.notification_queue),
+            'queue': self.notification_queue.stats(),
+            'inbox': len(self._inbox),
+            'coalesced': self.coalesced_count,
+            'dropped': self.dropped_count,
+            'rate_limited': self.rate_limited_count,
+            'batches_drained': self.batches_drained,
+            'largest_batch': self.largest_batch,
+            'updates_received': self.updates_received,
+            'updates_applied': self.updates_applied,
+            'degradation': {
+                'level': self.degradation_level,
+                'name': DEGRADATION_LEVELS[self.degradation_level],
+                'changes': self.degradation_changes,
+                'max_notifications': self.max_notifications,
+                'lag': self.lag_monitor.lag if self.lag_monitor is not None else None,
+            },
+            'live_notifiers': Notifier.live_count,
+            'backend': self.backend.stats(),
+            'pool': self.pool.stats(),
+            'expiry': self.expiry.stats(),
+            'icon_cache': icon_cache.stats(),
+            'text_measure_cache': text_measure_cache.stats(),
+            'background_cache': background_cache.stats(),
+            'instrumentation': instrumentation.stats(),
+        }
+
+    def _show_notification(self, record):
         """Show a new notification."""
-        notification = Notifier(
-            self.parent,
-            message,
-            notification_type=notification_type,
-            auto_hide=auto_hide,
-            close_callback=self._remove_notification
-        )
+        token = instrumentation.begin('manager.show')
+        notification = self._create_notifier(record)
+        notification.coalesce_key = record.key
+        notification.created_at = record.created
+        notification.expiry = self.expiry
+        notification.duration = self.auto_hide_duration if record.duration is None else record.duration
+        if record.repeat_count > 1:
+            notification.set_repeat_count(record.repeat_count)
+        if record.progress is not None:
+            notification.set_progress(record.progress)
+        notification.set_show_icon(self.show_icons)
+        entry = self._coalesce_index.get(record.key)
+        if entry is None or entry[0] is record:
+            self._coalesce_index[record.key] = [notification, time.monotonic() if entry is None else entry[1]]
         self.active_notifications.append(notification)
         self._position_notifications()
-        notification.show_notification()
+        if self._collapsed():
+            # Only the badge is visible; the notification appears once the stack is shown again
+            notification.start_auto_hide()
+        else:
+            notification.show_notification()
+        instrumentation.end(token)
+
+    def _create_notifier(self, record):
+        """Have the backend create the widget, card or headless object that displays a record."""
+        return self.backend.create(record, self._remove_notification)
 
     def _remove_notification(self, notification):
         """Remove a notification from the active list and process the queue."""
         # Check if the notification is the "more notifications" notification
         if notification.is_more_notifications:
+            if self.history is not None:
+                self.history.record_notifier(notification, 'closed')
+                for n in self.active_notifications:
+                    if n is not notification:
+                        self.history.record_notifier(n, 'cleared')
+                for record in self.notification_queue:
+                    self.history.record_pending(record, 'cleared')
             # Close all notifications and clear the queue
             for n in self.active_notifications:
                 n.hide()
-                n.deleteLater()
+                n.dispose()
             self.active_notifications.clear()
             self.notification_queue.clear()
-            self.notification_icon.update_count()
+            self._coalesce_index.clear()
+            self._unreported_drops = 0
+            self._update_icon_count()
         else:
-            if notification in self.active_notifications:
-                self.active_notifications.remove(notification)
+            if self.history is not None:
+                self.history.record_notifier(notification, 'closed')
+            self.active_notifications.discard(notification)
+            entry = self._coalesce_index.get(notification.coalesce_key)
+            if entry is not None and entry[0] is notification:
+                del self._coalesce_index[notification.coalesce_key]
             self._process_next_notification()
             self._position_notifications()
-            self.notification_icon.update_count()
+            self._update_icon_count()
+        self._sample_gauges()
 
     def _process_next_notification(self):
         """Show the next notification from the queue."""
-        if self.notification_queue:
-            next_message, next_type, next_auto_hide = self.notification_queue.pop(0)
-            self.add_notification(next_message, next_type, next_auto_hide)
+        # The stack can be over max_notifications while the manager runs a reduced stack
+        if self.notification_queue and len(self.active_notifications) < self.max_notifications:
+            self._admit(self.notification_queue.pop())
         self._update_top_notification()
 
     def _update_top_notification(self):
         """Update the topmost notification to show remaining queued notifications."""
-        if len(self.active_notifications) == self.max_notifications:
+        if not self.notification_queue:
+            # Drops are only reported next to a backlog; once it has drained they are
+            # history (see dropped_count), not a reason to cover a real notification
+            self._unreported_drops = 0
+        if len(self.active_notifications) >= self.max_notifications:
             remaining = len(self.notification_queue)
+            dropped = self._unreported_drops
             top_notification = self.active_notifications[0]
             if remaining > 0:
-                top_notification.set_message(
-                    f"You have {remaining} more notifications.",
-                    notification_type=NotificationType.MORE
-                )
+                summary = f"You have {remaining} more notifications."
+                if dropped:
+                    summary = f"{remaining} more, {dropped} dropped."
+                top_notification.set_message(summary, notification_type=NotificationType.MORE)
             else:
                 top_notification.set_message(
                     top_notification.original_message,
-                    notification_type=top_notification.notification_type
+                    notification_type=top_notification.original_type
                 )
         else:
             for notification in self.active_notifications:
                 notification.set_message(
                     notification.original_message,
-                    notification_type=notification.notification_type
+                    notification_type=notification.original_type
                 )
 
     def _position_notifications(self):
         """Reposition all active notifications or show the notification icon based on window size."""
-        if not self.parent:
+        if not self.parent or not self.backend.needs_layout:
             return
+        if self._batching:
+            self._layout_dirty = True
+            return
+
+        self._layout_timer.stop()
+        token = instrumentation.begin('manager.layout')
 
-        # Check if window is larger than minimum size
-        if self.parent.width() >= MIN_WIDTH and self.parent.height() >= MIN_HEIGHT:
+        # Check if window is larger than minimum size and the manager is not in badge mode
+        if not self._collapsed():
             # Show notifications
-            self.notification_icon.hide()
-            # Get the global position of the parent window
-            main_window_pos = self.parent.mapToGlobal(QtCore.QPoint(0, 0))
+            if self.notification_icon is not None and not self.notification_icon.isHidden():
+                self.notification_icon.hide()
+            if self.overlay is not None:
+                # Overlay cards are positioned in the parent window's own coordinates
+                self.overlay.sync_geometry()
+                main_window_pos = QtCore.QPoint(0, 0)
+            else:
+                # Get the global position of the parent window
+                main_window_pos = self.parent.mapToGlobal(QtCore.QPoint(0, 0))
             x = main_window_pos.x()
             y = main_window_pos.y()
             width = self.parent.width()
@@ -487,24 +3394,266 @@ class NotificationManager(QtCore.QObject):
             top_margin = 20  # Top margin for the first notification
             spacing = 5  # Space between notifications
 
-            # Position each notification
+            # Position each notification; adjust_size is a no-op unless its inputs changed
             for i, notification in enumerate(self.active_notifications):
                 notification.adjust_size()
                 y_offset = y + top_margin + i * (notification.height() + spacing)
                 x_offset = x + width - notification.width() - 20
 
-                notification.move(x_offset, y_offset)
-                notification.show()  # Use show() instead of show_notification()
+                # Only move notifications whose target geometry changed
+                if notification.x() != x_offset or notification.y() != y_offset:
+                    notification.move(x_offset, y_offset)
+                if notification.isHidden():
+                    notification.show()  # Use show() instead of show_notification()
         else:
             # Hide notifications and show icon with count
             for notification in self.active_notifications:
-                notification.hide_notification()
+                if not notification.isHidden():
+                    notification.hide_notification()
+            if self.notification_icon is None:
+                self.notification_icon = NotificationIcon(self.parent, self)
             self.notification_icon.update_count()
             self.notification_icon.adjust_position()
-            self.notification_icon.show()
+            if self.notification_icon.isHidden():
+                self.notification_icon.show()
+        instrumentation.end(token)
+
+class _DaemonClient:
+    """State of one process connected to a NotificationDaemon."""
+    def __init__(self, socket, decoder, bucket):
+        self.socket = socket
+        self.decoder = decoder
+        self.bucket = bucket
+        self.batches = deque()  # [batch id, items, next item index, accepted, dropped]
+        self.pending_items = 0
+
+class NotificationDaemon(QtCore.QObject):
+    """Serve a NotificationManager to other processes over a QLocalServer.
+
+    Clients (see notification_client.py) send length-prefixed JSON batches.
+    Each client's items are handed to the manager at up to rate per second,
+    and a batch is acknowledged only once all its items have been handled, so
+    a client that keeps a bounded number of batches in flight is slowed down
+    rather than dropped. Items beyond max_pending per client are dropped and
+    reported in the acknowledgement.
+    """
+    def __init__(self, name, manager=None, rate=100, burst=None, max_pending=10000, parent=None):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate!r}")
+        super().__init__(parent)
+        from PyQt5 import QtNetwork  # Imported on first use to keep startup lean
+        self.name = name
+        self.manager = manager if manager is not None else NotificationManager.get_instance()
+        self.rate = rate
+        self.burst = burst
+        self.max_pending = max_pending
+        self.server = QtNetwork.QLocalServer(self)
+        self.server.setSocketOptions(QtNetwork.QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self._accept)
+        self._clients = []
+        self.received = 0
+        self.accepted = 0
+        self.dropped = 0
+
+        # Clients that ran out of tokens are served again once their buckets refill
+        self._throttle_timer = QTimer(self)
+        self._throttle_timer.setSingleShot(True)
+        self._throttle_timer.setInterval(max(1, int(1000 / rate)))
+        self._throttle_timer.timeout.connect(self._serve_all)
+
+    def listen(self):
+        """Start listening and return the full server name; raises RuntimeError on failure."""
+        # Remove the socket file left behind by a daemon that did not shut down cleanly
+        self.server.removeServer(self.name)
+        if not self.server.listen(self.name):
+            raise RuntimeError(f"Cannot listen on {self.name}: {self.server.errorString()}")
+        return self.server.fullServerName()
+
+    def close(self):
+        """Stop listening and disconnect every client."""
+        self._throttle_timer.stop()
+        for client in list(self._clients):
+            client.socket.abort()
+        self._clients.clear()
+        self.server.close()
+
+    def stats(self):
+        return {
+            'clients': len(self._clients),
+            'received': self.received,
+            'accepted': self.accepted,
+            'dropped': self.dropped,
+            'pending': sum(client.pending_items for client in self._clients),
+        }
+
+    def _accept(self):
+        from notification_client import FrameDecoder
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            client = _DaemonClient(socket, FrameDecoder(), TokenBucket(self.rate, self.burst))
+            self._clients.append(client)
+            socket.readyRead.connect(lambda client=client: self._read(client))
+            socket.disconnected.connect(lambda client=client: self._disconnect(client))
+
+    def _disconnect(self, client):
+        if client in self._clients:
+            self._clients.remove(client)
+            # Batches the client never saw acknowledged still count toward the totals
+            for batch in client.batches:
+                self.accepted += batch[3]
+                self.dropped += batch[4]
+            self.dropped += client.pending_items
+            client.batches.clear()
+            client.pending_items = 0
+        client.socket.deleteLater()
+
+    def _read(self, client):
+        try:
+            frames = client.decoder.feed(bytes(client.socket.readAll()))
+        except ValueError as e:
+            print(f"Disconnecting notification client: {e}")
+            client.socket.abort()
+            return
+        for frame in frames:
+            items = frame.get('items') if isinstance(frame, dict) else None
+            if not isinstance(items, list):
+                print("Disconnecting notification client: malformed batch")
+                client.socket.abort()
+                return
+            self.received += len(items)
+            room = max(0, self.max_pending - client.pending_items)
+            overflow = max(0, len(items) - room)
+            if overflow:
+                # Counted in self.dropped along with the rest of the batch once it is acknowledged
+                items = items[:room]
+            client.batches.append([frame.get('id'), items, 0, 0, overflow])
+            client.pending_items += len(items)
+        self._serve(client)
+
+    def _serve_all(self):
+        for client in list(self._clients):
+            self._serve(client)
+
+    def _serve(self, client):
+        """Hand a client's queued items to the manager while its token bucket allows."""
+        from notification_client import encode_frame
+        if not client.batches:
+            return
+        # Items are added as one manager batch, so the stack is laid out once
+        with self.manager.batch():
+            while client.batches:
+                batch = client.batches[0]
+                items = batch[1]
+                while batch[2] < len(items):
+                    if not client.bucket.consume():
+                        if not self._throttle_timer.isActive():
+                            self._throttle_timer.start()
+                        return
+                    item = items[batch[2]]
+                    batch[2] += 1
+                    client.pending_items -= 1
+                    if self._dispatch(item):
+                        batch[3] += 1
+                    else:
+                        batch[4] += 1
+                client.batches.popleft()
+                self.accepted += batch[3]
+                self.dropped += batch[4]
+                client.socket.write(encode_frame({
+                    'id': batch[0],
+                    'accepted': batch[3],
+                    'dropped': batch[4],
+                    'queued': client.pending_items,
+                }))
+
+    def _dispatch(self, item):
+        """Pass one client item to the manager; return False if it is malformed."""
+        try:
+            op, args = _validate_item(item)
+        except (TypeError, ValueError):
+            return False
+        if op == 'n':
+            self.manager.add_notification(*args)
+        else:
+            self.manager.update_notification(*args)
+        return True
+
+# Types a client may send; MORE is reserved for the manager's own summary
+CLIENT_NOTIFICATION_TYPES = frozenset(
+    notification_type for notification_type in NOTIFICATION_SEVERITY if notification_type != NotificationType.MORE)
+
+def _client_key(value):
+    """Return a group or update key from JSON as a hashable value; JSON has no tuples."""
+    if isinstance(value, list):
+        return tuple(_client_key(part) for part in value)
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    raise TypeError(f"Unusable key: {value!r}")
+
+def _client_number(value, name):
+    """Return a finite JSON number as a float, or None."""
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value != value or value in (
+            float('inf'), float('-inf')):
+        raise TypeError(f"{name} must be a finite number or null")
+    return float(value)
+
+def _validate_item(item):
+    """Check and convert a daemon client item before it reaches the manager.
+
+    Returns ('n', add_notification arguments) or ('u', update_notification
+    arguments); raises TypeError or ValueError for a malformed item, so that
+    nothing is shown or queued for it.
+    """
+    if not isinstance(item, list) or not item:
+        raise TypeError("Item must be a non-empty list")
+    op, *args = item
+    if op == 'n':
+        if len(args) != 6:
+            raise ValueError("Notification items have 6 fields")
+        message, notification_type, auto_hide, priority, group, duration = args
+        key = None
+    elif op == 'u':
+        if len(args) != 7:
+            raise ValueError("Update items have 7 fields")
+        key, message, notification_type, progress, auto_hide, priority, duration = args
+        key = _client_key(key)
+        progress = _client_number(progress, 'progress')
+        if progress is not None:
+            progress = min(1.0, max(0.0, progress))
+    else:
+        raise ValueError(f"Unknown item kind: {op!r}")
+    if not isinstance(message, str):
+        raise TypeError("message must be a string")
+    if notification_type not in CLIENT_NOTIFICATION_TYPES:
+        raise ValueError(f"Unknown notification type: {notification_type!r}")
+    if not isinstance(auto_hide, bool):
+        raise TypeError("auto_hide must be a boolean")
+    if isinstance(priority, bool) or not isinstance(priority, int):
+        raise TypeError("priority must be an integer")
+    duration = _client_number(duration, 'duration')
+    if duration is not None and duration < 0:
+        raise ValueError("duration must not be negative")
+    if op == 'n':
+        return op, (message, notification_type, auto_hide, priority, _client_key(group), duration)
+    return op, (key, message, notification_type, progress, auto_hide, priority, duration)
 
 # Example usage
 if __name__ == '__main__':
+    def daemon_main(name):
+        """Display notifications sent by other processes until interrupted."""
+        app = QApplication(sys.argv)
+        app.setQuitOnLastWindowClosed(False)
+        # Never shown: anchors the notification stack to the available screen area
+        anchor = QWidget()
+        anchor.setGeometry(app.primaryScreen().availableGeometry())
+        # Senders can overload the GUI thread, so shed work while its event loop lags
+        manager = NotificationManager(anchor, adaptive=True)
+        daemon = manager.serve(name)
+        print(f"Serving notifications on {daemon.server.fullServerName()}")
+        sys.exit(app.exec_())
+
     def main():
         app = QApplication(sys.argv)
 
@@ -551,4 +3700,7 @@ if __name__ == '__main__':
         window.show()
         sys.exit(app.exec_())
 
-    main()
+    if len(sys.argv) == 3 and sys.argv[1] == '--daemon':
+        daemon_main(sys.argv[2])
+    else:
+        main()
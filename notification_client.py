@@ -0,0 +1,135 @@
+"""Qt-free client for a notification.py daemon (see NotificationDaemon).
+
+Helper processes can send toasts to one display process without creating a
+QApplication of their own:
+
+    from notification_client import NotificationClient
+
+    with NotificationClient('myapp-notifications') as client:
+        client.notify("Build finished", 'SUCCESS')
+        client.update('upload', "Uploaded 412/10000 files", progress=0.0412)
+
+Notifications are sent in batches. Each batch is one frame: a 4-byte
+big-endian length followed by a UTF-8 JSON object {"id": n, "items": [...]},
+where an item is ['n', message, type, auto_hide, priority, group, duration]
+or ['u', key, message, type, progress, auto_hide, priority, duration]. The
+daemon answers every batch with an acknowledgement frame once it has handled
+all its items: {"id": n, "accepted": a, "dropped": d, "queued": q}. A client
+never has more than max_in_flight batches unacknowledged, so a daemon that
+throttles it slows it down instead of buffering without bound.
+
+The daemon listens on a Unix domain socket (QLocalServer); this client does
+not support the named pipes QLocalServer uses on Windows.
+"""
+import json
+import os
+import socket
+import struct
+
+HEADER = struct.Struct('>I')
+MAX_FRAME_SIZE = 4 * 1024 * 1024
+
+def encode_frame(payload):
+    """Serialize payload as one length-prefixed JSON frame."""
+    data = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    if len(data) > MAX_FRAME_SIZE:
+        raise ValueError(f"Frame of {len(data)} bytes exceeds {MAX_FRAME_SIZE}")
+    return HEADER.pack(len(data)) + data
+
+class FrameDecoder:
+    """Incrementally split a byte stream into decoded JSON frames."""
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data):
+        """Add received bytes and return the frames they complete; raises ValueError on a bad frame."""
+        self._buffer += data
+        frames = []
+        while len(self._buffer) >= HEADER.size:
+            (length,) = HEADER.unpack_from(self._buffer)
+            if length > MAX_FRAME_SIZE:
+                raise ValueError(f"Frame of {length} bytes exceeds {MAX_FRAME_SIZE}")
+            end = HEADER.size + length
+            if len(self._buffer) < end:
+                break
+            payload = bytes(self._buffer[HEADER.size:end])
+            del self._buffer[:end]
+            frames.append(json.loads(payload.decode('utf-8')))
+        return frames
+
+def socket_path(name):
+    """Return the socket path QLocalServer uses for name on Unix."""
+    if os.path.isabs(name):
+        return name
+    # QLocalServer places relative names in QDir::tempPath(), which honours TMPDIR
+    return os.path.join(os.environ.get('TMPDIR') or '/tmp', name)
+
+class NotificationClient:
+    """Connection to a notification daemon that batches notifications and honours its acknowledgements."""
+    def __init__(self, name, batch_size=64, max_in_flight=4, timeout=10.0):
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(socket_path(name))
+        self._decoder = FrameDecoder()
+        self._pending = []  # Items not yet sent
+        self._in_flight = {}  # batch id -> number of items
+        self._next_id = 0
+        self.sent = 0
+        self.accepted = 0
+        self.dropped = 0
+        self.queued = 0  # Items the daemon reported as still waiting for this client
+
+    def notify(self, message, notification_type='INFO', auto_hide=True, priority=0, group=None, duration=None):
+        """Queue a notification; it is sent with the next full batch or flush()."""
+        self._add(['n', message, notification_type, auto_hide, priority, group, duration])
+
+    def update(self, key, message, notification_type='INFO', progress=None, auto_hide=True, priority=0,
+               duration=None):
+        """Queue an in-place update of the notification identified by key."""
+        self._add(['u', key, message, notification_type, progress, auto_hide, priority, duration])
+
+    def _add(self, item):
+        self._pending.append(item)
+        if len(self._pending) >= self.batch_size:
+            self.flush(wait=False)
+
+    def flush(self, wait=True):
+        """Send the pending batch; with wait, block until the daemon acknowledged every batch."""
+        if self._pending:
+            # Backpressure: block while the daemon still holds max_in_flight batches
+            while len(self._in_flight) >= self.max_in_flight:
+                self._receive()
+            batch_id = self._next_id
+            self._next_id += 1
+            self._socket.sendall(encode_frame({'id': batch_id, 'items': self._pending}))
+            self._in_flight[batch_id] = len(self._pending)
+            self.sent += len(self._pending)
+            self._pending = []
+        while wait and self._in_flight:
+            self._receive()
+
+    def _receive(self):
+        data = self._socket.recv(65536)
+        if not data:
+            raise ConnectionError("Notification daemon closed the connection")
+        for ack in self._decoder.feed(data):
+            self._in_flight.pop(ack.get('id'), None)
+            self.accepted += ack.get('accepted', 0)
+            self.dropped += ack.get('dropped', 0)
+            self.queued = ack.get('queued', 0)
+
+    def close(self):
+        """Flush pending notifications and disconnect."""
+        try:
+            self.flush()
+        finally:
+            self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False